@@ -133,18 +133,26 @@ class BackendAgent(BaseAgent):
     def _get_default_fastapi_files(self, task: Dict[str, Any]) -> Dict[str, str]:
         """Get default FastAPI application files"""
         return {
-            "main.py": """from fastapi import FastAPI, HTTPException, Depends
+            "main.py": """from fastapi import FastAPI, HTTPException, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
 import models
 import database
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
-# Create database tables
-models.Base.metadata.create_all(bind=database.engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables
+    async with database.engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    yield
+    await database.engine.dispose()
 
-app = FastAPI(title="Todo API", version="1.0.0")
+app = FastAPI(title="Todo API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -165,48 +173,59 @@ class TodoUpdate(BaseModel):
     completed: bool = None
 
 class TodoResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     text: str
     completed: bool
-    
-    class Config:
-        from_attributes = True
+
+# Schema is compiled once; list responses bypass FastAPI's per-request validation
+TODOS_ADAPTER = TypeAdapter(List[TodoResponse])
 
 # Dependency to get database session
-def get_db():
-    db = database.SessionLocal()
-    try:
+async def get_db():
+    async with database.SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Todo API is running!"}
 
 @app.get("/todos", response_model=List[TodoResponse])
-def get_todos(db: Session = Depends(get_db)):
-    todos = db.query(models.Todo).all()
-    return todos
+async def get_todos(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    stmt = (
+        select(models.Todo)
+        .options(selectinload("*"))
+        .order_by(models.Todo.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    result = await db.scalars(stmt)
+    todos = TODOS_ADAPTER.validate_python(result.all(), from_attributes=True)
+    return Response(content=TODOS_ADAPTER.dump_json(todos), media_type="application/json")
 
 @app.post("/todos", response_model=TodoResponse)
-def create_todo(todo: TodoCreate, db: Session = Depends(get_db)):
+async def create_todo(todo: TodoCreate, db: AsyncSession = Depends(get_db)):
     db_todo = models.Todo(text=todo.text, completed=todo.completed)
     db.add(db_todo)
-    db.commit()
-    db.refresh(db_todo)
+    await db.commit()
+    await db.refresh(db_todo)
     return db_todo
 
 @app.get("/todos/{todo_id}", response_model=TodoResponse)
-def get_todo(todo_id: int, db: Session = Depends(get_db)):
-    todo = db.query(models.Todo).filter(models.Todo.id == todo_id).first()
+async def get_todo(todo_id: int, db: AsyncSession = Depends(get_db)):
+    todo = await db.get(models.Todo, todo_id)
     if todo is None:
         raise HTTPException(status_code=404, detail="Todo not found")
     return todo
 
 @app.put("/todos/{todo_id}", response_model=TodoResponse)
-def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get_db)):
-    todo = db.query(models.Todo).filter(models.Todo.id == todo_id).first()
+async def update_todo(todo_id: int, todo_update: TodoUpdate, db: AsyncSession = Depends(get_db)):
+    todo = await db.get(models.Todo, todo_id)
     if todo is None:
         raise HTTPException(status_code=404, detail="Todo not found")
     
@@ -215,18 +234,18 @@ def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get
     if todo_update.completed is not None:
         todo.completed = todo_update.completed
     
-    db.commit()
-    db.refresh(todo)
+    await db.commit()
+    await db.refresh(todo)
     return todo
 
 @app.delete("/todos/{todo_id}")
-def delete_todo(todo_id: int, db: Session = Depends(get_db)):
-    todo = db.query(models.Todo).filter(models.Todo.id == todo_id).first()
+async def delete_todo(todo_id: int, db: AsyncSession = Depends(get_db)):
+    todo = await db.get(models.Todo, todo_id)
     if todo is None:
         raise HTTPException(status_code=404, detail="Todo not found")
     
-    db.delete(todo)
-    db.commit()
+    await db.delete(todo)
+    await db.commit()
     return {"message": "Todo deleted successfully"}
 
 if __name__ == "__main__":
@@ -243,23 +262,37 @@ class Todo(Base):
     text = Column(String, index=True)
     completed = Column(Boolean, default=False)""",
             
-            "database.py": """from sqlalchemy import create_engine
+            "database.py": """from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./todos.db"
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./todos.db"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# No pool_size/max_overflow: SQLAlchemy 2.0 uses NullPool for file-based aiosqlite
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_pre_ping=True,
+    query_cache_size=1200
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@event.listens_for(engine.sync_engine, "connect")
+def _sqlite_pragmas(dbapi_conn, connection_record):
+    # WAL: append-only writes, readers don't block writers
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 Base = declarative_base()""",
             
             "requirements.txt": """fastapi==0.104.1
 uvicorn==0.24.0
-sqlalchemy==2.0.23
+pydantic==2.5.2
+sqlalchemy[asyncio]==2.0.23
+aiosqlite==0.19.0
 python-multipart==0.0.6""",
             
             "README.md": """# Todo API Backend
@@ -287,7 +320,7 @@ uvicorn main:app --reload --host 0.0.0.0 --port 8000
 ## API Endpoints
 
 - GET `/` - Health check
-- GET `/todos` - Get all todos
+- GET `/todos?limit=100&offset=0` - Get todos (paginated, limit 1-1000)
 - POST `/todos` - Create new todo
 - GET `/todos/{id}` - Get specific todo
 - PUT `/todos/{id}` - Update todo
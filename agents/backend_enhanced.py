@@ -4,11 +4,11 @@ Enhanced Backend Agent - Advanced API development with FastAPI/Flask/Django, Gra
 Task 5: Backend Agent API Enhancement
 """
 import asyncio
-import json
+import compileall
 import os
 import sys
-from typing import Dict, Any, List, Optional
-from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,6 +16,23 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.base_agent import BaseAgent
 from core.ollama_client import ollama_client
 
+# Keyword -> auth method, checked in order (first match wins)
+_AUTH_KEYWORDS = MappingProxyType({
+    'oauth': 'oauth2',
+    'jwt': 'jwt',
+    'session': 'session',
+    'api-key': 'api-key',
+    'apikey': 'api-key',
+})
+
+def _match_keyword(text: str, keywords: Mapping[str, str], default: str) -> str:
+    """Return the value of the first keyword contained in text"""
+    return next((name for keyword, name in keywords.items() if keyword in text), default)
+
+def _write_file(file_path: str, content: str) -> None:
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
 class BackendEnhancedAgent(BaseAgent):
     def __init__(self, config: Dict[str, Any]):
         super().__init__("backend_enhanced", "Enhanced Backend Developer", config)
@@ -23,6 +40,9 @@ class BackendEnhancedAgent(BaseAgent):
         self.frameworks = ['fastapi', 'flask', 'django', 'starlette', 'sanic']
         self.databases = ['postgresql', 'mysql', 'sqlite', 'mongodb', 'redis']
         self.auth_methods = ['jwt', 'oauth2', 'basic', 'api-key', 'session']
+        # Keyword tables for _determine_*, built once per agent
+        self._framework_index = MappingProxyType({fw: fw for fw in self.frameworks})
+        self._database_index = MappingProxyType({db: db for db in self.databases})
         
     def get_capabilities(self) -> List[str]:
         return [
@@ -94,34 +114,17 @@ class BackendEnhancedAgent(BaseAgent):
             if fw in self.frameworks:
                 return fw
         
-        # Check requirements and task description
+        # Check requirements and task description, default to FastAPI
         req_text = f"{requirements} {task.get('title', '')} {task.get('description', '')}".lower()
-        for fw in self.frameworks:
-            if fw in req_text:
-                return fw
-        
-        return "fastapi"  # Default to FastAPI
+        return _match_keyword(req_text, self._framework_index, "fastapi")
     
     def _determine_database(self, requirements: Dict) -> str:
         """Determine which database to use"""
-        req_str = str(requirements).lower()
-        for db in self.databases:
-            if db in req_str:
-                return db
-        return "postgresql"  # Default to PostgreSQL
+        return _match_keyword(str(requirements).lower(), self._database_index, "postgresql")
     
     def _determine_auth_method(self, requirements: Dict) -> str:
         """Determine which authentication method to use"""
-        req_str = str(requirements).lower()
-        if 'oauth' in req_str or 'oauth2' in req_str:
-            return 'oauth2'
-        elif 'jwt' in req_str:
-            return 'jwt'
-        elif 'session' in req_str:
-            return 'session'
-        elif 'api-key' in req_str or 'apikey' in req_str:
-            return 'api-key'
-        return 'jwt'  # Default to JWT
+        return _match_keyword(str(requirements).lower(), _AUTH_KEYWORDS, "jwt")
     
     def _determine_features(self, requirements: Dict, task: Dict) -> List[str]:
         """Determine which features to include"""
@@ -154,10 +157,11 @@ class BackendEnhancedAgent(BaseAgent):
         return features
     
     async def _create_advanced_fastapi_backend(self, task: Dict[str, Any], output_dir: str,
-                                             database: str, auth_method: str, features: List[str]) -> Dict[str, Any]:
-        """Create advanced FastAPI backend with all features"""
+                                             database: str, auth_method: str, features: List[str],
+                                             dry_run: bool = False, precompile: bool = False) -> Dict[str, Any]:
+        """Create advanced FastAPI backend with all features (dry_run: only plan the files,
+        precompile: write .pyc files so importing the generated project skips compilation)"""
         backend_dir = os.path.join(output_dir, "backend")
-        os.makedirs(backend_dir, exist_ok=True)
         
         files = {}
         
@@ -261,6 +265,7 @@ class BackendEnhancedAgent(BaseAgent):
         
         # Testing
         files["tests/__init__.py"] = ""
+        files["tests/conftest.py"] = self._get_tests_conftest()
         files["tests/test_main.py"] = self._get_main_tests()
         files["tests/test_auth.py"] = self._get_auth_tests(auth_method)
         files["tests/test_crud.py"] = self._get_crud_tests()
@@ -274,17 +279,8 @@ class BackendEnhancedAgent(BaseAgent):
         # Health check
         files["health.py"] = self._get_health_check_file(database)
         
-        # Write all files
-        created_files = []
-        for filename, content in files.items():
-            file_path = os.path.join(backend_dir, filename)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            created_files.append(file_path)
-        
-        return {
+        created_files = [os.path.join(backend_dir, filename) for filename in files]
+        result = {
             "status": "completed",
             "files_created": created_files,
             "output_directory": backend_dir,
@@ -293,6 +289,26 @@ class BackendEnhancedAgent(BaseAgent):
             "authentication": auth_method,
             "features": features
         }
+        if dry_run:
+            # Nothing is written, so callers must not see the paths as created files
+            result["status"] = "planned"
+            result["files_planned"] = result.pop("files_created")
+            result["files_created"] = []
+            return result
+        
+        # Write all files, each parent directory is created once and the writes run in parallel threads
+        for directory in {os.path.dirname(file_path) for file_path in created_files}:
+            os.makedirs(directory, exist_ok=True)
+        
+        await asyncio.gather(*(
+            asyncio.to_thread(_write_file, file_path, content)
+            for file_path, content in zip(created_files, files.values())
+        ))
+        
+        if precompile:
+            await asyncio.to_thread(compileall.compile_dir, backend_dir, quiet=1, workers=0)
+        
+        return result
     
     def _get_fastapi_main_file(self, database: str, auth_method: str, features: List[str]) -> str:
         imports = """from fastapi import FastAPI, Middleware
@@ -1506,8 +1522,10 @@ CMD ["uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8000"]"""
         
         return compose_content
     
-    def _get_main_tests(self) -> str:
-        return """import pytest
+    def _get_tests_conftest(self) -> str:
+        return """import uuid
+
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -1515,7 +1533,7 @@ from sqlalchemy.pool import StaticPool
 
 from main import app
 from database import get_db, Base
-from models import User
+from auth import create_user
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -1537,22 +1555,41 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
-client = TestClient(app)
+@pytest.fixture(scope="session")
+def client():
+    # One client for the whole session, so app startup runs only once
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def db_session():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
 
-def test_read_root():
+@pytest.fixture
+def test_user(db_session):
+    # Fresh user per test, so todos from other tests are not counted
+    name = f"user_{uuid.uuid4().hex[:8]}"
+    return create_user(db_session, name, f"{name}@example.com", "testpass123")"""
+    
+    def _get_main_tests(self) -> str:
+        return """def test_read_root(client):
     response = client.get("/")
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
     assert data["message"] == "Advanced FastAPI Backend"
 
-def test_health_check():
+def test_health_check(client):
     response = client.get("/health/")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
 
-def test_register_user():
+def test_register_user(client):
     response = client.post(
         "/api/v1/users/register",
         json={"username": "testuser", "email": "test@example.com", "password": "testpass123"}
@@ -1562,7 +1599,7 @@ def test_register_user():
     assert data["username"] == "testuser"
     assert data["email"] == "test@example.com"
 
-def test_login_user():
+def test_login_user(client):
     # First register a user
     client.post(
         "/api/v1/users/register",
@@ -1579,7 +1616,7 @@ def test_login_user():
     assert "access_token" in data
     assert data["token_type"] == "bearer"
 
-def test_get_current_user():
+def test_get_current_user(client):
     # Register and login to get token
     client.post(
         "/api/v1/users/register",
@@ -1600,15 +1637,11 @@ def test_get_current_user():
     assert response.status_code == 200
     data = response.json()
     assert data["username"] == "currentuser"
-    assert data["email"] == "current@example.com"""
+    assert data["email"] == "current@example.com"
+"""
     
     def _get_auth_tests(self, auth_method: str) -> str:
-        return f"""import pytest
-from fastapi.testclient import TestClient
-from main import app
-from auth import create_access_token, verify_password, get_password_hash
-
-client = TestClient(app)
+        return f"""from auth import create_access_token, verify_password, get_password_hash
 
 def test_create_access_token():
     token = create_access_token(data={{"sub": "testuser"}})
@@ -1621,18 +1654,18 @@ def test_password_hashing():
     assert verify_password(password, hashed)
     assert not verify_password("wrongpassword", hashed)
 
-def test_invalid_login():
+def test_invalid_login(client):
     response = client.post(
         "/api/v1/users/token",
         data={{"username": "nonexistent", "password": "wrongpass"}}
     )
     assert response.status_code == 401
 
-def test_protected_route_without_token():
+def test_protected_route_without_token(client):
     response = client.get("/api/v1/users/me")
     assert response.status_code == 401
 
-def test_protected_route_with_invalid_token():
+def test_protected_route_with_invalid_token(client):
     response = client.get(
         "/api/v1/users/me",
         headers={{"Authorization": "Bearer invalid_token"}}
@@ -3,6 +3,7 @@
 Database Agent - Comprehensive database management, schema generation and optimization
 """
 import asyncio
+import copy
 import json
 import os
 import sys
@@ -244,7 +245,8 @@ class DatabaseAgent(BaseAgent):
         
         # Check if we have a template for this project type
         if project_type in self.schema_templates:
-            base_schema = self.schema_templates[project_type]
+            # Deep copy, enhancing and optimizing must not grow the shared template
+            base_schema = copy.deepcopy(self.schema_templates[project_type])
         else:
             # Use AI to generate schema
             base_schema = await self._generate_ai_schema(requirements)
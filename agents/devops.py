@@ -2855,7 +2855,7 @@ scrape_configs:
         "type": "singlestat",
         "targets": [
           {
-            "expr": "rate(http_requests_total{status=~\"5..\"}[5m]) / rate(http_requests_total[5m]) * 100",
+            "expr": "rate(http_requests_total{status=~\\"5..\\"}[5m]) / rate(http_requests_total[5m]) * 100",
             "legendFormat": "Error Rate %"
           }
         ],
@@ -2886,7 +2886,7 @@ scrape_configs:
         "type": "singlestat",
         "targets": [
           {
-            "expr": "sum(up{job=\"backend\"})",
+            "expr": "sum(up{job=\\"backend\\"})",
             "legendFormat": "Active Instances"
           }
         ],
@@ -2903,7 +2903,7 @@ scrape_configs:
         "type": "graph",
         "targets": [
           {
-            "expr": "(1 - rate(node_cpu_seconds_total{mode=\"idle\"}[5m])) * 100",
+            "expr": "(1 - rate(node_cpu_seconds_total{mode=\\"idle\\"}[5m])) * 100",
             "legendFormat": "{{instance}}"
           }
         ],
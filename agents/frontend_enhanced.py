@@ -7,6 +7,7 @@ import asyncio
 import json
 import os
 import sys
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
@@ -16,6 +17,29 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.base_agent import BaseAgent
 from core.ollama_client import ollama_client
 
+_APP_COMPONENT_IMPORTS = '''import React from 'react';
+import TodoList from './components/TodoList';
+import AddTodo from './components/AddTodo';'''
+
+# State-Management -> (Imports, Wrapper-Anfang, Wrapper-Ende) für die App-Komponente
+_APP_STATE_WRAPPERS = MappingProxyType({
+    'redux': (
+        '''import React from 'react';
+import { Provider } from 'react-redux';
+import { store } from './store';
+import TodoList from './components/TodoList';
+import AddTodo from './components/AddTodo';''',
+        '<Provider store={store}>',
+        '</Provider>',
+    ),
+    'context-api': (
+        _APP_COMPONENT_IMPORTS + '\nimport { AppProvider } from "./context/AppContext";',
+        '<AppProvider>',
+        '</AppProvider>',
+    ),
+})
+_APP_DEFAULT_WRAPPER = (_APP_COMPONENT_IMPORTS, '<>', '</>')
+
 class FrontendEnhancedAgent(BaseAgent):
     def __init__(self, config: Dict[str, Any]):
         super().__init__("frontend_enhanced", "Enhanced Frontend Developer", config)
@@ -574,25 +598,7 @@ REACT_APP_NAME=Your App Name
     
     def _get_react_app_component(self, css_framework: str, state_mgmt: str) -> str:
         """Get main React App component based on configuration"""
-        if state_mgmt == 'redux':
-            imports = '''import React from 'react';
-import { Provider } from 'react-redux';
-import { store } from './store';
-import TodoList from './components/TodoList';
-import AddTodo from './components/AddTodo';'''
-            wrapper_start = '<Provider store={store}>'
-            wrapper_end = '</Provider>'
-        else:
-            imports = '''import React from 'react';
-import TodoList from './components/TodoList';
-import AddTodo from './components/AddTodo';'''
-            if state_mgmt == 'context-api':
-                imports += '\nimport { AppProvider } from "./context/AppContext";'
-                wrapper_start = '<AppProvider>'
-                wrapper_end = '</AppProvider>'
-            else:
-                wrapper_start = '<>'
-                wrapper_end = '</>'
+        imports, wrapper_start, wrapper_end = _APP_STATE_WRAPPERS.get(state_mgmt, _APP_DEFAULT_WRAPPER)
         
         css_classes = self._get_app_css_classes(css_framework)
         
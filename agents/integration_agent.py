@@ -204,11 +204,9 @@ class IntegrationAgent(BaseAgent):
         """Background task to process events from the event queue"""
         while True:
             try:
-                # Get event from queue with timeout
-                event = await asyncio.wait_for(self.event_queue.get(), timeout=1.0)
+                # Wait for the next event (no polling timeout needed)
+                event = await self.event_queue.get()
                 await self._process_event(event)
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 self.logger.error(f"Error in event processor: {str(e)}")
     
@@ -219,18 +219,31 @@ class OrchestratorAgent(BaseAgent):
         output_dir = f"{demo_output}/{project_id}"
         os.makedirs(output_dir, exist_ok=True)
         
-        # Execute tasks
+        # Execute tasks: agents work concurrently, each agent keeps its task order
         tasks = project["plan"].get("tasks", [])
+        lanes: Dict[str, List[Dict[str, Any]]] = {}
         for task in tasks:
-            await self._execute_task(project_id, task, output_dir)
+            lanes.setdefault(self._agent_for_task(task), []).append(task)
+        
+        await asyncio.gather(*(
+            self._execute_lane(project_id, lane, output_dir) for lane in lanes.values()
+        ))
         
         project["status"] = "completed"
         self.logger.info(f"Completed project: {project_id}")
     
+    def _agent_for_task(self, task: Dict[str, Any]) -> str:
+        """Map a task to the agent responsible for it"""
+        return "frontend" if task.get("type", "frontend") == "frontend" else "backend"
+    
+    async def _execute_lane(self, project_id: str, tasks: List[Dict[str, Any]], output_dir: str):
+        """Execute the tasks of one agent sequentially"""
+        for task in tasks:
+            await self._execute_task(project_id, task, output_dir)
+    
     async def _execute_task(self, project_id: str, task: Dict[str, Any], output_dir: str):
         """Execute a single task"""
-        task_type = task.get("type", "frontend")
-        agent_id = "frontend" if task_type == "frontend" else "backend"
+        agent_id = self._agent_for_task(task)
         
         if agent_id not in self.agents:
             self.logger.error(f"Agent {agent_id} not available")
@@ -5,109 +5,311 @@ Ollama Client für LLM-Integration
 import json
 import aiohttp
 import asyncio
+import copy
+import os
 import yaml
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+from core.response_cache import ResponseCache, DEFAULT_CACHE_DIR, DEFAULT_TTL
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+    _json_loads = json.loads
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Shared HTTP sessions (keep-alive connection pools), one per event loop and
+# transport settings so clients with another socket or timeout never share one
+_SessionKey = Tuple[asyncio.AbstractEventLoop, Optional[str], float]
+_sessions: Dict[_SessionKey, aiohttp.ClientSession] = {}
+_session_lock = asyncio.Lock()
+
+# libyaml C loader if available (several times faster than pure Python)
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Successfully parsed config files by path
+_yaml_cache: Dict[str, dict] = {}
+
+def _load_yaml_config(path: str) -> dict:
+    """Load a YAML config file; parsed once per path, each caller gets a copy"""
+    config = _yaml_cache.get(path)
+    if config is None:
+        try:
+            with open(path, 'r') as f:
+                config = yaml.load(f, Loader=_YamlLoader) or {}
+        except Exception:
+            # Not cached, a file that appears later is still picked up
+            return {}
+        _yaml_cache[path] = config
+    return copy.deepcopy(config)
 
 class OllamaClient:
     def __init__(self, base_url: str = "http://localhost:11434"):
-        self.base_url = base_url
-        self.session = None
         self.config = self._load_config()
-    
+        ollama_config = self.config.get('ollama', {})
+        # Local Ollama over a Unix domain socket skips the TCP loopback stack
+        self.socket_path = ollama_config.get('socket_path')
+        if base_url.startswith('unix://'):
+            self.socket_path = base_url[len('unix://'):]
+        self.base_url = "http://localhost" if self.socket_path else base_url
+        self._timeout = ollama_config.get('timeout', 30)
+        self.cache_enabled = ollama_config.get('cache', True)
+        self._cache: Optional[ResponseCache] = None
+        self._session_key: Optional[_SessionKey] = None
+        self._prefix_cache: Dict[Tuple[str, bool], bytes] = {}
+
     def _load_config(self):
         """Load configuration from YAML file"""
-        try:
-            with open('/home/ubuntu/nexus_config.yaml', 'r') as f:
-                return yaml.safe_load(f)
-        except Exception:
-            return {}
-    
+        return _load_yaml_config('/home/ubuntu/nexus_config.yaml')
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session for this loop and transport, creating it once"""
+        key = (asyncio.get_running_loop(), self.socket_path, self._timeout)
+        self._session_key = key
+        session = _sessions.get(key)
+        if session is not None and not session.closed:
+            return session
+
+        async with _session_lock:
+            # Sessions of finished loops cannot be closed from this one, only dropped
+            for stale in [k for k in _sessions if k[0].is_closed()]:
+                _sessions.pop(stale).detach()
+            session = _sessions.get(key)
+            if session is None or session.closed:
+                session = aiohttp.ClientSession(
+                    connector=self._make_connector(),
+                    timeout=aiohttp.ClientTimeout(total=self._timeout)
+                )
+                _sessions[key] = session
+            return session
+
+    def _make_connector(self) -> aiohttp.BaseConnector:
+        """Unix socket connector if configured, otherwise pooled TCP"""
+        if self.socket_path:
+            return aiohttp.UnixConnector(
+                path=self.socket_path,
+                limit=100,
+                keepalive_timeout=90
+            )
+        return aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=20,
+            keepalive_timeout=90,
+            enable_cleanup_closed=True
+        )
+
+    async def _get_cache(self) -> Optional[ResponseCache]:
+        """Persistent response cache, opened in a thread on first use"""
+        if not self.cache_enabled:
+            return None
+        if self._cache is None:
+            ollama_config = self.config.get('ollama', {})
+            # makedirs and the sqlite connect would otherwise block the event loop
+            cache = await asyncio.to_thread(
+                ResponseCache,
+                cache_dir=os.path.expanduser(ollama_config.get('cache_dir', DEFAULT_CACHE_DIR)),
+                ttl=ollama_config.get('cache_ttl', DEFAULT_TTL)
+            )
+            if self._cache is None:
+                self._cache = cache
+            else:
+                # A concurrent first call won the race
+                await asyncio.to_thread(cache.close)
+        return self._cache
+
+    @property
+    def session(self) -> Optional[aiohttp.ClientSession]:
+        return _sessions.get(self._session_key) if self._session_key else None
+
+    async def aclose(self):
+        """Close the shared sessions of the running loop (call once on shutdown)"""
+        loop = asyncio.get_running_loop()
+        for key in [k for k in _sessions if k[0] is loop]:
+            session = _sessions.pop(key)
+            if not session.closed:
+                await session.close()
+
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        await self._get_session()
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
-    
-    async def generate(self, model: str, prompt: str, system: str = None, 
-                      stream: bool = False) -> Dict[str, Any]:
-        """Generate response from Ollama model"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": stream
-        }
-        
+        # Session bleibt für weitere Aufrufe offen; Schließen über aclose()
+        pass
+
+    def _encode_payload(self, model: str, prompt: str, system: str = None,
+                        stream: bool = False, keep_alive: str = None) -> bytes:
+        """Encode a generate payload, reusing the encoded model/stream prefix"""
+        prefix = self._prefix_cache.get((model, stream))
+        if prefix is None:
+            prefix = _json_dumps({"model": model, "stream": stream})[:-1] + b',"prompt":'
+            self._prefix_cache[(model, stream)] = prefix
+
+        parts = [prefix, _json_dumps(prompt)]
         if system:
-            payload["system"] = system
-        
+            parts += [b',"system":', _json_dumps(system)]
+        if keep_alive:
+            parts += [b',"keep_alive":', _json_dumps(keep_alive)]
+        parts.append(b'}')
+        return b''.join(parts)
+
+    async def generate(self, model: str, prompt: str, system: str = None,
+                      stream: bool = False, keep_alive: str = None) -> Dict[str, Any]:
+        """Generate response from Ollama model"""
+        if stream:
+            # Assemble the NDJSON stream into a single response dict
+            parts = []
+            result: Dict[str, Any] = {}
+            async for chunk in self._stream_generate(model, prompt, system, keep_alive):
+                parts.append(chunk.get("response", ""))
+                result = chunk
+            result["response"] = "".join(parts)
+            return result
+
+        session = await self._get_session()
+
+        payload = self._encode_payload(model, prompt, system, stream, keep_alive)
+
+        cache = None if stream else await self._get_cache()
+        if cache is not None:
+            cache_key = cache.make_key("generate", model, system, prompt)
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            async with self.session.post(
+            async with session.post(
                 f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.get('ollama', {}).get('timeout', 30))
+                data=payload,
+                headers=_JSON_HEADERS
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = _json_loads(await response.read())
+                    if cache is not None:
+                        await asyncio.to_thread(cache.set, cache_key, result)
                     return result
                 else:
                     error_text = await response.text()
                     raise Exception(f"Ollama API error: {response.status} - {error_text}")
         except Exception as e:
             raise Exception(f"Failed to connect to Ollama: {str(e)}")
-    
+
+    async def generate_stream(self, model: str, prompt: str, system: str = None,
+                              keep_alive: str = None) -> AsyncIterator[str]:
+        """Yield response tokens as Ollama produces them"""
+        async for chunk in self._stream_generate(model, prompt, system, keep_alive):
+            token = chunk.get("response")
+            if token:
+                yield token
+
+    async def _stream_generate(self, model: str, prompt: str, system: str = None,
+                               keep_alive: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the decoded NDJSON chunks of a streaming generate call"""
+        session = await self._get_session()
+
+        payload = self._encode_payload(model, prompt, system, True, keep_alive)
+
+        try:
+            async with session.post(
+                f"{self.base_url}/api/generate",
+                data=payload,
+                headers=_JSON_HEADERS,
+                # Long completions are fine as long as tokens keep arriving
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=self._timeout)
+            ) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise Exception(f"Ollama API error: {response.status} - {error_text}")
+                async for line in response.content:
+                    if line.strip():
+                        yield _json_loads(line)
+        except Exception as e:
+            raise Exception(f"Failed to connect to Ollama: {str(e)}")
+
     async def chat(self, model: str, messages: List[Dict[str, str]]) -> Dict[str, Any]:
         """Chat with Ollama model using conversation format"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
+        session = await self._get_session()
+
         payload = {
             "model": model,
             "messages": messages,
             "stream": False
         }
-        
+
+        cache = await self._get_cache()
+        if cache is not None:
+            cache_key = cache.make_key("chat", model, messages)
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            async with self.session.post(
+            async with session.post(
                 f"{self.base_url}/api/chat",
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=self.config.get('ollama', {}).get('timeout', 30))
+                data=_json_dumps(payload),
+                headers=_JSON_HEADERS
             ) as response:
                 if response.status == 200:
-                    result = await response.json()
+                    result = _json_loads(await response.read())
+                    if cache is not None:
+                        await asyncio.to_thread(cache.set, cache_key, result)
                     return result
                 else:
                     error_text = await response.text()
                     raise Exception(f"Ollama API error: {response.status} - {error_text}")
         except Exception as e:
             raise Exception(f"Failed to connect to Ollama: {str(e)}")
-    
+
+    async def _fetch_models(self) -> List[str]:
+        """Query /api/tags; raises if Ollama is unreachable"""
+        session = await self._get_session()
+        async with session.get(f"{self.base_url}/api/tags") as response:
+            if response.status != 200:
+                raise Exception(f"Ollama API error: {response.status}")
+            result = _json_loads(await response.read())
+            return [model["name"] for model in result.get("models", [])]
+
     async def list_models(self) -> List[str]:
         """List available models"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        
         try:
-            async with self.session.get(f"{self.base_url}/api/tags") as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return [model["name"] for model in result.get("models", [])]
-                else:
-                    return []
+            return await self._fetch_models()
         except Exception:
             return []
-    
-    async def check_health(self) -> bool:
-        """Check if Ollama is running"""
+
+    async def warmup(self, connections: int = 4) -> int:
+        """Open keep-alive connections ahead of the first real request.
+
+        Returns the number of connections that were established.
+        """
+        session = await self._get_session()
+
+        async def _head() -> bool:
+            async with session.head(f"{self.base_url}/") as response:
+                await response.read()
+                return response.status < 500
+
+        results = await asyncio.gather(
+            *(_head() for _ in range(connections)), return_exceptions=True
+        )
+        return sum(1 for result in results if result is True)
+
+    async def health_status(self) -> Tuple[bool, List[str]]:
+        """Return (ok, models) from a single /api/tags request"""
         try:
-            models = await self.list_models()
-            return len(models) >= 0
+            models = await self._fetch_models()
+            return True, models
         except Exception:
-            return False
+            return False, []
+
+    async def check_health(self) -> bool:
+        """Check if Ollama is running"""
+        ok, _ = await self.health_status()
+        return ok
 
 # Singleton instance
 ollama_client = OllamaClient()
@@ -0,0 +1,112 @@
+
+"""
+Response Cache - Persistenter SQLite-Cache für deterministische LLM-Antworten
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "nexus", "ollama")
+DEFAULT_TTL = 7 * 86400  # 1 Woche
+
+
+class ResponseCache:
+    """
+    Key/value store for LLM responses, keyed by a hash of the request
+
+    Thread-safe, so callers can run the blocking calls via asyncio.to_thread.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_TTL):
+        self.ttl = ttl
+        self.db_path = os.path.join(cache_dir, "responses.db")
+        self.logger = logging.getLogger("nexus.ollama.cache")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"Response cache disabled: {str(e)}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Hash the request parts into a stable cache key"""
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return cached response or None on miss/expiry"""
+        with self._lock:
+            if self._conn is None:
+                return None
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at < time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict[str, Any], expire: Optional[int] = None) -> None:
+        """Store a response with TTL (seconds)"""
+        expires_at = time.time() + (self.ttl if expire is None else expire)
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Could not cache response: {str(e)}")
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def clear(self) -> None:
+        """Remove all cached responses"""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -8,6 +8,9 @@ import sys
 import os
 import yaml
 from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Final
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -15,6 +18,31 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from agents.orchestrator import OrchestratorAgent
 from agents.frontend import FrontendAgent
 from agents.backend import BackendAgent
+from core.ollama_client import ollama_client
+
+# Projekt-Optionen (statisch, einmal pro Prozess aufgebaut)
+_PROJECTS: Final = MappingProxyType({
+    "1": {
+        "type": "todo_app",
+        "name": "Todo List App",
+        "description": "React Todo-Liste mit FastAPI Backend",
+        "technologies": {
+            "frontend": "react",
+            "backend": "fastapi",
+            "database": "sqlite"
+        }
+    },
+    "2": {
+        "type": "blog",
+        "name": "Simple Blog",
+        "description": "Einfacher Blog mit HTML/CSS/JS und Flask",
+        "technologies": {
+            "frontend": "html",
+            "backend": "flask",
+            "database": "sqlite"
+        }
+    }
+})
 
 async def run_demo():
     """Führt eine vollständige Demo des NEXUS Agent-Systems aus"""
@@ -33,48 +61,28 @@ async def run_demo():
         
         # Agents erstellen
         print("\n🤖 Erstelle Agents...")
-        orchestrator = OrchestratorAgent(config)
-        frontend_agent = FrontendAgent(config)
-        backend_agent = BackendAgent(config)
+        orchestrator, frontend_agent, backend_agent = await asyncio.gather(
+            asyncio.to_thread(OrchestratorAgent, config),
+            asyncio.to_thread(FrontendAgent, config),
+            asyncio.to_thread(BackendAgent, config)
+        )
         print("✅ Alle Agents erstellt")
         
         # Agents registrieren
         print("\n🔗 Registriere Agents...")
-        await orchestrator.register_agent("frontend", frontend_agent)
-        await orchestrator.register_agent("backend", backend_agent)
+        await asyncio.gather(
+            orchestrator.register_agent("frontend", frontend_agent),
+            orchestrator.register_agent("backend", backend_agent)
+        )
         print("✅ Agents registriert")
         
-        # Projekt-Optionen
-        projects = {
-            "1": {
-                "type": "todo_app",
-                "name": "Todo List App",
-                "description": "React Todo-Liste mit FastAPI Backend",
-                "technologies": {
-                    "frontend": "react",
-                    "backend": "fastapi",
-                    "database": "sqlite"
-                }
-            },
-            "2": {
-                "type": "blog",
-                "name": "Simple Blog",
-                "description": "Einfacher Blog mit HTML/CSS/JS und Flask",
-                "technologies": {
-                    "frontend": "html",
-                    "backend": "flask",
-                    "database": "sqlite"
-                }
-            }
-        }
-        
         # Benutzer-Auswahl (oder automatisch Todo-App)
         print("\n📝 Verfügbare Projekt-Templates:")
-        for key, project in projects.items():
+        for key, project in _PROJECTS.items():
             print(f"  {key}. {project['name']} - {project['description']}")
         
         # Automatisch Todo-App auswählen für Demo
-        selected_project = projects["1"]
+        selected_project = _PROJECTS["1"]
         print(f"\n🎯 Erstelle Projekt: {selected_project['name']}")
         
         # Projekt erstellen
@@ -93,13 +101,13 @@ async def run_demo():
             # Dateien auflisten
             if os.path.exists(project_dir):
                 print("\n📄 Erstellte Dateien:")
-                for root, dirs, files in os.walk(project_dir):
-                    level = root.replace(project_dir, '').count(os.sep)
-                    indent = ' ' * 2 * level
-                    print(f"{indent}{os.path.basename(root)}/")
-                    subindent = ' ' * 2 * (level + 1)
-                    for file in files:
-                        print(f"{subindent}{file}")
+                root = Path(project_dir)
+                lines = [f"{root.name}/"]
+                for path in sorted(root.rglob('*')):
+                    indent = ' ' * 2 * len(path.relative_to(root).parts)
+                    suffix = '/' if path.is_dir() else ''
+                    lines.append(f"{indent}{path.name}{suffix}")
+                sys.stdout.write("\n".join(lines) + "\n")
                 
                 # Anweisungen für den Benutzer
                 print(f"\n🎉 Demo erfolgreich abgeschlossen!")
@@ -122,6 +130,9 @@ async def run_demo():
         print(f"❌ Fehler während der Demo: {str(e)}")
         import traceback
         traceback.print_exc()
+    finally:
+        # Gemeinsame Ollama-Session beim Beenden schließen
+        await ollama_client.aclose()
     
     print(f"\n⏰ Ende Zeit: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 50)
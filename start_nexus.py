@@ -9,6 +9,8 @@ import os
 import yaml
 import argparse
 from datetime import datetime
+from types import MappingProxyType
+from typing import Final
 
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -18,21 +20,52 @@ from agents.frontend import FrontendAgent
 from agents.backend import BackendAgent
 from core.ollama_client import ollama_client
 
+# Statische Projekt-Vorlagen und Menü (einmal pro Prozess aufgebaut)
+_PROJECT_REQUESTS: Final = MappingProxyType({
+    "todo_app": {
+        "type": "todo_app",
+        "description": "React Todo-Liste mit FastAPI Backend",
+        "technologies": {
+            "frontend": "react",
+            "backend": "fastapi",
+            "database": "sqlite"
+        }
+    },
+    "blog": {
+        "type": "blog",
+        "description": "Einfacher Blog mit HTML/CSS/JS und Flask",
+        "technologies": {
+            "frontend": "html",
+            "backend": "flask",
+            "database": "sqlite"
+        }
+    }
+})
+
+_MENU: Final = (
+    "\nVerfügbare Aktionen:\n"
+    "1. Todo-App erstellen\n"
+    "2. Blog erstellen\n"
+    "3. Custom Projekt\n"
+    "4. System Status\n"
+    "5. Beenden\n"
+)
+
 async def check_system_health():
     """Überprüft die System-Gesundheit mit Timeouts"""
     print("🔍 System Health Check")
     print("-" * 30)
     
-    # Ollama-Verbindung prüfen mit Timeout
+    # Ollama-Verbindung prüfen mit gemeinsamem Timeout-Budget
     try:
         async with asyncio.timeout(10.0):  # 10 Sekunden Timeout
             async with ollama_client:
-                health_task = asyncio.wait_for(ollama_client.check_health(), timeout=5.0)
-                health = await health_task
+                # Ein Request liefert Status und Modell-Liste
+                health, models = await ollama_client.health_status()
                 
                 if health:
-                    models_task = asyncio.wait_for(ollama_client.list_models(), timeout=5.0)
-                    models = await models_task
+                    # Verbindungen vorwärmen, damit der erste generate-Call keinen Handshake zahlt
+                    await ollama_client.warmup()
                     print(f"✅ Ollama: Verbunden ({len(models)} Modelle verfügbar)")
                     if models:
                         print(f"   Verfügbare Modelle: {', '.join(models[:3])}{'...' if len(models) > 3 else ''}")
@@ -45,25 +78,28 @@ async def check_system_health():
     except Exception as e:
         print(f"❌ Ollama: Fehler - {str(e)}")
     
-    # Verzeichnisse prüfen
+    # Verzeichnisse prüfen (ein scandir statt einzelner exists-Aufrufe)
+    with os.scandir(".") as it:
+        entries = {entry.name for entry in it}
+    
     directories = [
-        "./demo",
-        "./agents",
-        "./core"
+        "demo",
+        "agents",
+        "core"
     ]
     
     for directory in directories:
-        if os.path.exists(directory):
-            print(f"✅ Verzeichnis: {directory}")
+        if directory in entries:
+            print(f"✅ Verzeichnis: ./{directory}")
         else:
-            print(f"❌ Verzeichnis fehlt: {directory}")
+            print(f"❌ Verzeichnis fehlt: ./{directory}")
     
     # Konfiguration prüfen
-    config_path = "./nexus_config.yaml"
-    if os.path.exists(config_path):
-        print(f"✅ Konfiguration: {config_path}")
+    config_file = "nexus_config.yaml"
+    if config_file in entries:
+        print(f"✅ Konfiguration: ./{config_file}")
     else:
-        print(f"❌ Konfiguration fehlt: {config_path}")
+        print(f"❌ Konfiguration fehlt: ./{config_file}")
     
     print()
 
@@ -121,10 +157,12 @@ async def create_agents_with_retry(max_retries=3):
             # Agents parallel erstellen
             print(f"🔧 Erstelle Agents (Versuch {attempt + 1}/{max_retries})...")
             
-            # Agents erstellen (synchron, aber parallel vorbereitet)
-            orchestrator = OrchestratorAgent(config)
-            frontend_agent = FrontendAgent(config)
-            backend_agent = BackendAgent(config)
+            # Agents parallel in Worker-Threads erstellen
+            orchestrator, frontend_agent, backend_agent = await asyncio.gather(
+                asyncio.to_thread(OrchestratorAgent, config),
+                asyncio.to_thread(FrontendAgent, config),
+                asyncio.to_thread(BackendAgent, config)
+            )
             
             # Agents parallel registrieren mit Timeout
             print("🔗 Registriere Agents...")
@@ -139,8 +177,8 @@ async def create_agents_with_retry(max_retries=3):
                 )
             ]
             
-            # Parallel ausführen mit asyncio.gather
-            await asyncio.gather(*registration_tasks, return_exceptions=True)
+            # Parallel ausführen; Fehler lösen den Retry aus
+            await asyncio.gather(*registration_tasks)
             
             print("✅ Alle Agents erfolgreich initialisiert")
             return orchestrator, frontend_agent, backend_agent
@@ -164,44 +202,30 @@ async def interactive_mode(orchestrator):
     print("=" * 40)
     
     while True:
-        print("\nVerfügbare Aktionen:")
-        print("1. Todo-App erstellen")
-        print("2. Blog erstellen")
-        print("3. Custom Projekt")
-        print("4. System Status")
-        print("5. Beenden")
+        sys.stdout.write(_MENU)
         
         choice = input("\nWähle eine Aktion (1-5): ").strip()
         
-        if choice == "1":
-            await create_todo_app(orchestrator)
-        elif choice == "2":
-            await create_blog(orchestrator)
-        elif choice == "3":
-            await create_custom_project(orchestrator)
-        elif choice == "4":
-            await check_system_health()
-        elif choice == "5":
-            print("👋 NEXUS beendet")
-            break
-        else:
-            print("❌ Ungültige Auswahl")
+        match choice:
+            case "1":
+                await create_todo_app(orchestrator)
+            case "2":
+                await create_blog(orchestrator)
+            case "3":
+                await create_custom_project(orchestrator)
+            case "4":
+                await check_system_health()
+            case "5":
+                print("👋 NEXUS beendet")
+                break
+            case _:
+                print("❌ Ungültige Auswahl")
 
 async def create_todo_app(orchestrator):
     """Erstellt eine Todo-App"""
     print("\n📝 Erstelle Todo-App...")
     
-    project_request = {
-        "type": "todo_app",
-        "description": "React Todo-Liste mit FastAPI Backend",
-        "technologies": {
-            "frontend": "react",
-            "backend": "fastapi",
-            "database": "sqlite"
-        }
-    }
-    
-    result = await orchestrator.process_task(project_request)
+    result = await orchestrator.process_task(_PROJECT_REQUESTS["todo_app"])
     
     if result["status"] == "completed":
         project_id = result["project_id"]
@@ -216,17 +240,7 @@ async def create_blog(orchestrator):
     """Erstellt einen Blog"""
     print("\n📰 Erstelle Blog...")
     
-    project_request = {
-        "type": "blog",
-        "description": "Einfacher Blog mit HTML/CSS/JS und Flask",
-        "technologies": {
-            "frontend": "html",
-            "backend": "flask",
-            "database": "sqlite"
-        }
-    }
-    
-    result = await orchestrator.process_task(project_request)
+    result = await orchestrator.process_task(_PROJECT_REQUESTS["blog"])
     
     if result["status"] == "completed":
         project_id = result["project_id"]
@@ -312,25 +326,29 @@ async def main():
     print(f"Start: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
-    # System-Check
-    await check_system_health()
-    
-    if args.mode == "health":
-        return
-    
-    # Agents initialisieren
-    orchestrator, frontend_agent, backend_agent = await create_agents()
-    
-    if args.mode == "demo":
-        # Demo-Modus
-        project_type = args.project_type or "todo_app"
-        if project_type == "todo_app":
-            await create_todo_app(orchestrator)
-        elif project_type == "blog":
-            await create_blog(orchestrator)
-    else:
-        # Interaktiver Modus
-        await interactive_mode(orchestrator)
+    try:
+        # System-Check
+        await check_system_health()
+        
+        if args.mode == "health":
+            return
+        
+        # Agents initialisieren
+        orchestrator, frontend_agent, backend_agent = await create_agents()
+        
+        if args.mode == "demo":
+            # Demo-Modus
+            project_type = args.project_type or "todo_app"
+            if project_type == "todo_app":
+                await create_todo_app(orchestrator)
+            elif project_type == "blog":
+                await create_blog(orchestrator)
+        else:
+            # Interaktiver Modus
+            await interactive_mode(orchestrator)
+    finally:
+        # Gemeinsame Ollama-Session beim Beenden schließen
+        await ollama_client.aclose()
 
 if __name__ == "__main__":
     try:
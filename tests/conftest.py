@@ -0,0 +1,34 @@
+
+"""
+Shared pytest configuration for the NEXUS test suite
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Make the project packages importable once for the whole session
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+
+# Markers for test categories
+def pytest_configure(config):
+    """Configure pytest markers and the temp root."""
+    config.addinivalue_line("markers", "integration: Integration tests")
+    config.addinivalue_line("markers", "slow: Slow-running tests (deselect with -m \"not slow\")")
+    config.addinivalue_line("markers", "fast: Pure unit tests without network or shared state (select with -m fast)")
+    
+    # Generated projects go to a RAM disk when there is one, unless TMPDIR is set explicitly
+    if not os.environ.get("TMPDIR") and os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        tempfile.tempdir = "/dev/shm/nexus-tests"
+        os.makedirs(tempfile.tempdir, exist_ok=True)
+
+@pytest.fixture(scope="session", autouse=True)
+def _disable_response_cache():
+    """Keep test runs from writing the persistent Ollama response cache"""
+    from core.ollama_client import ollama_client
+    ollama_client.cache_enabled = False
+    yield
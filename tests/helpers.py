@@ -0,0 +1,28 @@
+"""
+Assertion helpers shared by the NEXUS test modules
+"""
+import re
+from typing import Iterable
+
+def assert_all_substrings(haystack: str, needles: Iterable[str]) -> None:
+    """Assert that every needle occurs in haystack, scanning it only once."""
+    needles = tuple(needles)
+    # Longest first so a needle that contains another wins the match
+    pattern = re.compile("|".join(map(re.escape, sorted(set(needles), key=len, reverse=True))))
+    found = set(pattern.findall(haystack))
+    # Overlapping needles are hidden by the single pass, re-check only those
+    missing = [n for n in needles if n not in found and n not in haystack]
+    assert not missing, f"missing substrings: {missing}"
+
+class FakeOllama:
+    """Minimal stand-in for ollama_client; tests set .response, no call recording"""
+    response = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        return False
+    
+    async def generate(self, *args, **kwargs):
+        return self.response
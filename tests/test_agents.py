@@ -4,57 +4,81 @@ Test cases for NEXUS Agent System
 """
 import pytest
 import asyncio
+import json
 import os
-import sys
-import tempfile
-import shutil
-from unittest.mock import Mock, patch
-
-# Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from types import MappingProxyType
+from unittest.mock import Mock
 
 from agents.orchestrator import OrchestratorAgent
 from agents.frontend import FrontendAgent
 from agents.backend import BackendAgent
-from core.messaging import MessageBus, Message, MessageType
-import yaml
+from core.messaging import MessageBus
 
-@pytest.fixture
-def config():
-    """Test configuration"""
-    return {
-        'nexus': {
-            'version': '1.0.0',
-            'project_root': '/tmp/nexus_test'
+# Shared read-only test configuration
+_CONFIG = MappingProxyType({
+    'nexus': {
+        'version': '1.0.0',
+        'project_root': '/tmp/nexus_test'
+    },
+    'ollama': {
+        'base_url': 'http://localhost:11434',
+        'timeout': 30
+    },
+    'agents': {
+        'orchestrator': {
+            'id': 'orchestrator',
+            'model': 'qwen2.5-coder:7b'
         },
-        'ollama': {
-            'base_url': 'http://localhost:11434',
-            'timeout': 30
+        'frontend': {
+            'id': 'frontend',
+            'model': 'qwen2.5-coder:7b',
+            'technologies': ['react', 'html', 'css', 'javascript']
         },
-        'agents': {
-            'orchestrator': {
-                'id': 'orchestrator',
-                'model': 'qwen2.5-coder:7b'
-            },
-            'frontend': {
-                'id': 'frontend',
-                'model': 'qwen2.5-coder:7b',
-                'technologies': ['react', 'html', 'css', 'javascript']
-            },
-            'backend': {
-                'id': 'backend',
-                'model': 'codellama:7b',
-                'technologies': ['python', 'fastapi', 'flask']
-            }
+        'backend': {
+            'id': 'backend',
+            'model': 'codellama:7b',
+            'technologies': ['python', 'fastapi', 'flask']
         }
     }
+})
+
+@pytest.fixture(scope="session")
+def config():
+    """Test configuration"""
+    return _CONFIG
+
+# Shared agents for read-only tests; tests that mutate state build their own
+@pytest.fixture(scope="module")
+def orchestrator(config):
+    return OrchestratorAgent(config)
 
-@pytest.fixture
-def temp_dir():
-    """Create temporary directory for tests"""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+@pytest.fixture(scope="module")
+def frontend(config):
+    return FrontendAgent(config)
+
+@pytest.fixture(scope="module")
+def backend(config):
+    return BackendAgent(config)
+
+# Orchestrator with frontend/backend registered, writing into a module temp dir
+@pytest.fixture(scope="module")
+async def wired_orchestrator(config, tmp_path_factory):
+    demo_output = str(tmp_path_factory.mktemp("demo"))
+    # Copy, the shared config stays untouched
+    wired_config = dict(config, nexus={**config['nexus'], 'demo_output': demo_output})
+    orchestrator = OrchestratorAgent(wired_config)
+    await orchestrator.register_agent("frontend", FrontendAgent(wired_config))
+    await orchestrator.register_agent("backend", BackendAgent(wired_config))
+    return orchestrator
+
+# Default file sets are built once and shared by the structural tests
+@pytest.fixture(scope="module")
+def default_react_files(frontend):
+    return frontend._get_default_react_files({"title": "Test React App"})
+
+@pytest.fixture(scope="module")
+def default_fastapi_files(backend):
+    return backend._get_default_fastapi_files({"title": "Test FastAPI Backend"})
 
 class TestMessageBus:
     """Test message bus functionality"""
@@ -74,8 +98,7 @@ class TestMessageBus:
 class TestOrchestratorAgent:
     """Test orchestrator agent functionality"""
     
-    def test_orchestrator_creation(self, config):
-        orchestrator = OrchestratorAgent(config)
+    def test_orchestrator_creation(self, orchestrator):
         assert orchestrator.agent_id == "orchestrator"
         assert orchestrator.name == "Project Orchestrator"
         assert "project_planning" in orchestrator.get_capabilities()
@@ -87,8 +110,40 @@ class TestOrchestratorAgent:
         await orchestrator.register_agent("test_agent", mock_agent)
         assert "test_agent" in orchestrator.agents
     
-    def test_fallback_plan_creation(self, config):
-        orchestrator = OrchestratorAgent(config)
+    @pytest.mark.asyncio
+    async def test_execute_project_runs_agent_lanes_concurrently(self, config, tmp_path):
+        events = []
+        
+        class RecordingAgent:
+            async def process_task(self, task):
+                events.append(("start", task["task_id"]))
+                await asyncio.sleep(0.01)
+                events.append(("end", task["task_id"]))
+                return {"status": "completed"}
+        
+        orchestrator = OrchestratorAgent(dict(config, nexus={'demo_output': str(tmp_path)}))
+        await orchestrator.register_agent("frontend", RecordingAgent())
+        await orchestrator.register_agent("backend", RecordingAgent())
+        orchestrator.active_projects["p1"] = {
+            "status": "planned",
+            "tasks": {},
+            "plan": {"tasks": [
+                {"id": task_id, "type": task_type, "title": task_id, "description": ""}
+                for task_id, task_type in [("fe-1", "frontend"), ("be-1", "backend"),
+                                           ("fe-2", "frontend"), ("be-2", "backend")]
+            ]}
+        }
+        
+        await orchestrator.execute_project("p1")
+        
+        # Both lanes start before either finishes its first task
+        assert set(events[:2]) == {("start", "fe-1"), ("start", "be-1")}
+        # Within a lane, tasks run in plan order
+        assert events.index(("end", "fe-1")) < events.index(("start", "fe-2"))
+        assert events.index(("end", "be-1")) < events.index(("start", "be-2"))
+        assert len(orchestrator.active_projects["p1"]["tasks"]) == 4
+    
+    def test_fallback_plan_creation(self, orchestrator):
         project_request = {"type": "todo_app"}
         plan = orchestrator._create_fallback_plan(project_request)
         
@@ -100,16 +155,13 @@ class TestOrchestratorAgent:
 class TestFrontendAgent:
     """Test frontend agent functionality"""
     
-    def test_frontend_creation(self, config):
-        frontend = FrontendAgent(config)
+    def test_frontend_creation(self, frontend):
         assert frontend.agent_id == "frontend"
         assert frontend.name == "Frontend Developer"
         assert "react_development" in frontend.get_capabilities()
     
-    def test_default_react_files(self, config):
-        frontend = FrontendAgent(config)
-        task = {"title": "Test React App"}
-        files = frontend._get_default_react_files(task)
+    def test_default_react_files(self, default_react_files):
+        files = default_react_files
         
         assert "package.json" in files
         assert "src/App.js" in files
@@ -117,17 +169,18 @@ class TestFrontendAgent:
         assert "public/index.html" in files
         
         # Check if package.json is valid JSON
-        import json
         package_data = json.loads(files["package.json"])
         assert "react" in package_data["dependencies"]
     
     @pytest.mark.asyncio
-    async def test_process_task(self, config, temp_dir):
+    async def test_process_task(self, config, tmp_path, monkeypatch, default_react_files):
         frontend = FrontendAgent(config)
+        # Fallback path reuses the module's default file set instead of rebuilding it
+        monkeypatch.setattr(frontend, "_get_default_react_files", lambda task: default_react_files)
         task = {
             "title": "Create React App",
             "description": "Test React application",
-            "output_dir": temp_dir,
+            "output_dir": str(tmp_path),
             "architecture": {"frontend": "react"}
         }
         
@@ -135,20 +188,18 @@ class TestFrontendAgent:
         assert result["status"] == "completed"
         assert "files_created" in result
         assert len(result["files_created"]) > 0
+        assert all(os.path.isfile(path) for path in result["files_created"])
 
 class TestBackendAgent:
     """Test backend agent functionality"""
     
-    def test_backend_creation(self, config):
-        backend = BackendAgent(config)
+    def test_backend_creation(self, backend):
         assert backend.agent_id == "backend"
         assert backend.name == "Backend Developer"
         assert "api_development" in backend.get_capabilities()
     
-    def test_default_fastapi_files(self, config):
-        backend = BackendAgent(config)
-        task = {"title": "Test FastAPI Backend"}
-        files = backend._get_default_fastapi_files(task)
+    def test_default_fastapi_files(self, default_fastapi_files):
+        files = default_fastapi_files
         
         assert "main.py" in files
         assert "models.py" in files
@@ -159,12 +210,14 @@ class TestBackendAgent:
         assert "from fastapi import FastAPI" in files["main.py"]
     
     @pytest.mark.asyncio
-    async def test_process_task(self, config, temp_dir):
+    async def test_process_task(self, config, tmp_path, monkeypatch, default_fastapi_files):
         backend = BackendAgent(config)
+        # Fallback path reuses the module's default file set instead of rebuilding it
+        monkeypatch.setattr(backend, "_get_default_fastapi_files", lambda task: default_fastapi_files)
         task = {
             "title": "Create FastAPI Backend",
             "description": "Test FastAPI application",
-            "output_dir": temp_dir,
+            "output_dir": str(tmp_path),
             "architecture": {"backend": "fastapi"}
         }
         
@@ -172,25 +225,16 @@ class TestBackendAgent:
         assert result["status"] == "completed"
         assert "files_created" in result
         assert len(result["files_created"]) > 0
+        assert all(os.path.isfile(path) for path in result["files_created"])
 
+@pytest.mark.integration
 class TestIntegration:
     """Integration tests for the complete system"""
     
+    @pytest.mark.slow
     @pytest.mark.asyncio
-    async def test_full_project_creation(self, config, temp_dir):
+    async def test_full_project_creation(self, wired_orchestrator):
         """Test complete project creation workflow"""
-        # Override demo output directory
-        config['nexus']['demo_output'] = temp_dir
-        
-        # Create agents
-        orchestrator = OrchestratorAgent(config)
-        frontend = FrontendAgent(config)
-        backend = BackendAgent(config)
-        
-        # Register agents
-        await orchestrator.register_agent("frontend", frontend)
-        await orchestrator.register_agent("backend", backend)
-        
         # Create project
         project_request = {
             "type": "todo_app",
@@ -201,7 +245,7 @@ class TestIntegration:
             }
         }
         
-        result = await orchestrator.process_task(project_request)
+        result = await wired_orchestrator.process_task(project_request)
         
         # Verify result
         assert result["status"] == "completed"
@@ -209,17 +253,18 @@ class TestIntegration:
         
         # Check if files were created
         project_id = result["project_id"]
-        project_dir = os.path.join(temp_dir, project_id)
-        assert os.path.exists(project_dir)
-        assert os.path.exists(os.path.join(project_dir, "frontend"))
-        assert os.path.exists(os.path.join(project_dir, "backend"))
+        demo_output = wired_orchestrator.config['nexus']['demo_output']
+        project_dir = os.path.join(demo_output, project_id)
+        top = {entry.name: entry for entry in os.scandir(project_dir)}
+        assert "frontend" in top and top["frontend"].is_dir()
+        assert "backend" in top and top["backend"].is_dir()
         
         # Check specific files
-        frontend_files = os.listdir(os.path.join(project_dir, "frontend"))
-        backend_files = os.listdir(os.path.join(project_dir, "backend"))
+        frontend_files = {entry.name for entry in os.scandir(top["frontend"].path)}
+        backend_files = {entry.name for entry in os.scandir(top["backend"].path)}
         
-        assert any("package.json" in f for f in frontend_files)
-        assert any("main.py" in f for f in backend_files)
+        assert "package.json" in frontend_files
+        assert "main.py" in backend_files
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -3,28 +3,105 @@
 Tests for Analyst Agent
 """
 import pytest
-import asyncio
 import json
-import os
-import tempfile
-from unittest.mock import Mock, AsyncMock, patch
-from agents.analyst.agent import AnalystAgent, RequirementType, FeasibilityLevel, RiskLevel
+from types import MappingProxyType, SimpleNamespace
+from agents.analyst.agent import AnalystAgent, FeasibilityLevel
+from tests.helpers import FakeOllama
+
+# Shared read-only test configuration
+_CONFIG = MappingProxyType({
+    'agents': {
+        'analyst': {
+            'model': 'test-model'
+        }
+    }
+})
+
+# Canned Ollama responses, serialized once at import
+_MOCK_TODO_RESPONSE = MappingProxyType({
+    'response': json.dumps({
+        "requirements": [
+            {
+                "id": "REQ-001",
+                "type": "functional",
+                "title": "Create Todo Items",
+                "description": "Users can create new todo items",
+                "priority": 1,
+                "acceptance_criteria": ["User can add todo", "Todo is saved"],
+                "business_value": "Core functionality",
+                "estimated_effort": "medium"
+            }
+        ]
+    })
+})
+
+_MOCK_FEASIBILITY_RESPONSE = MappingProxyType({
+    'response': json.dumps({
+        "level": "medium",
+        "challenges": ["Complex implementation"],
+        "risks": ["Timeline pressure"],
+        "recommendations": ["Use proven technologies"]
+    })
+})
+
+_MOCK_REQUIREMENTS_RESPONSE = MappingProxyType({
+    'response': json.dumps({
+        "requirements": [
+            {
+                "id": "REQ-001",
+                "type": "functional",
+                "title": "Test Requirement",
+                "description": "Test description",
+                "priority": 1,
+                "acceptance_criteria": ["Test criteria"],
+                "business_value": "Test value",
+                "estimated_effort": "medium"
+            }
+        ]
+    })
+})
+
+# Read-only requirement inputs shared by the merge/metric tests
+_AI_REQS = (
+    MappingProxyType({"id": "REQ-001", "title": "User Authentication",
+                      "description": "Users can log in", "priority": 1}),
+)
+_TEMPLATE_REQS = (
+    MappingProxyType({"id": "REQ-T001", "title": "User Registration",
+                      "description": "Users can register", "priority": 2}),
+    MappingProxyType({"id": "REQ-T002", "title": "User Authentication",  # Duplicate
+                      "description": "Authentication system", "priority": 3}),
+)
+_MIXED_REQS = (
+    MappingProxyType({"type": "functional", "priority": 1, "estimated_effort": "large"}),
+    MappingProxyType({"type": "functional", "priority": 2, "estimated_effort": "medium"}),
+    MappingProxyType({"type": "non_functional", "priority": 1, "estimated_effort": "small"}),
+)
+_SIMPLE_REQS = (MappingProxyType({"priority": 3, "estimated_effort": "small"}),) * 5
+_COMPLEX_REQS = (MappingProxyType({"priority": 1, "estimated_effort": "extra_large"}),) * 30
+
+# Only feasibility_level is read, one shared instance per level is enough
+_HIGH = SimpleNamespace(feasibility_level=FeasibilityLevel.HIGH)
+_MEDIUM = SimpleNamespace(feasibility_level=FeasibilityLevel.MEDIUM)
+_LOW = SimpleNamespace(feasibility_level=FeasibilityLevel.LOW)
 
 class TestAnalystAgent:
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def config(self):
-        return {
-            'agents': {
-                'analyst': {
-                    'model': 'test-model'
-                }
-            }
-        }
+        return _CONFIG
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def analyst_agent(self, config):
+        # AnalystAgent keeps no per-task state, one instance serves all tests
         return AnalystAgent(config)
     
+    @pytest.fixture
+    def mock_ollama(self, monkeypatch):
+        """Replace the shared Ollama client; tests set .response"""
+        client = FakeOllama()
+        monkeypatch.setattr("agents.analyst.agent.ollama_client", client)
+        return client
+    
     def test_initialization(self, analyst_agent):
         """Test analyst agent initialization"""
         assert analyst_agent.agent_id == "analyst"
@@ -48,14 +125,20 @@ class TestAnalystAgent:
         for capability in expected_capabilities:
             assert capability in capabilities
     
+    @pytest.mark.parametrize("attr,keys", [
+        ("requirement_templates", ["web_application", "todo_application", "api_service"]),
+        ("feasibility_criteria", ["technical_complexity", "resource_availability", "time_constraints"]),
+        ("architecture_patterns", ["web_application"]),
+    ])
+    def test_knowledge_base_keys(self, analyst_agent, attr, keys):
+        """Test knowledge base dictionaries contain the expected entries"""
+        knowledge = getattr(analyst_agent, attr)
+        assert all(key in knowledge for key in keys)
+    
     def test_requirement_templates(self, analyst_agent):
         """Test requirement templates initialization"""
         templates = analyst_agent.requirement_templates
         
-        assert "web_application" in templates
-        assert "todo_application" in templates
-        assert "api_service" in templates
-        
         # Test web_application template structure
         web_app = templates["web_application"]
         assert len(web_app) > 0
@@ -70,10 +153,6 @@ class TestAnalystAgent:
         """Test feasibility criteria initialization"""
         criteria = analyst_agent.feasibility_criteria
         
-        assert "technical_complexity" in criteria
-        assert "resource_availability" in criteria
-        assert "time_constraints" in criteria
-        
         # Test structure
         for criterion_name, levels in criteria.items():
             assert isinstance(levels, dict)
@@ -85,8 +164,6 @@ class TestAnalystAgent:
         """Test architecture patterns initialization"""
         patterns = analyst_agent.architecture_patterns
         
-        assert "web_application" in patterns
-        
         web_patterns = patterns["web_application"]
         assert "frontend" in web_patterns
         assert "backend" in web_patterns
@@ -105,7 +182,7 @@ class TestAnalystAgent:
         assert "use_cases" in spa
     
     @pytest.mark.asyncio
-    async def test_analyze_requirements_with_template(self, analyst_agent):
+    async def test_analyze_requirements_with_template(self, analyst_agent, mock_ollama):
         """Test requirements analysis using templates"""
         project_description = {
             "type": "todo_application",
@@ -113,38 +190,21 @@ class TestAnalystAgent:
             "stakeholders": ["end_users", "product_owner"]
         }
         
-        with patch('agents.analyst.agent.ollama_client') as mock_client:
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.generate = AsyncMock(return_value={
-                'response': json.dumps({
-                    "requirements": [
-                        {
-                            "id": "REQ-001",
-                            "type": "functional",
-                            "title": "Create Todo Items",
-                            "description": "Users can create new todo items",
-                            "priority": 1,
-                            "acceptance_criteria": ["User can add todo", "Todo is saved"],
-                            "business_value": "Core functionality",
-                            "estimated_effort": "medium"
-                        }
-                    ]
-                })
-            })
-            
-            result = await analyst_agent.analyze_requirements(project_description)
-            
-            assert "requirements" in result
-            assert "stakeholder_analysis" in result
-            assert "requirement_metrics" in result
-            assert result["project_type"] == "todo_application"
-            
-            requirements = result["requirements"]
-            assert len(requirements) > 0
-            
-            # Should include both AI and template requirements
-            req_titles = [req["title"] for req in requirements]
-            assert any("todo" in title.lower() for title in req_titles)
+        mock_ollama.response = _MOCK_TODO_RESPONSE
+        
+        result = await analyst_agent.analyze_requirements(project_description)
+        
+        assert "requirements" in result
+        assert "stakeholder_analysis" in result
+        assert "requirement_metrics" in result
+        assert result["project_type"] == "todo_application"
+        
+        requirements = result["requirements"]
+        assert len(requirements) > 0
+        
+        # Should include both AI and template requirements
+        req_titles = [req["title"] for req in requirements]
+        assert any("todo" in title.lower() for title in req_titles)
     
     def test_apply_requirement_templates(self, analyst_agent):
         """Test application of requirement templates"""
@@ -163,31 +223,7 @@ class TestAnalystAgent:
     
     def test_merge_requirements(self, analyst_agent):
         """Test merging of AI and template requirements"""
-        ai_requirements = [
-            {
-                "id": "REQ-001",
-                "title": "User Authentication",
-                "description": "Users can log in",
-                "priority": 1
-            }
-        ]
-        
-        template_requirements = [
-            {
-                "id": "REQ-T001",
-                "title": "User Registration",
-                "description": "Users can register",
-                "priority": 2
-            },
-            {
-                "id": "REQ-T002",
-                "title": "User Authentication",  # Duplicate
-                "description": "Authentication system",
-                "priority": 3
-            }
-        ]
-        
-        merged = analyst_agent._merge_requirements(ai_requirements, template_requirements)
+        merged = analyst_agent._merge_requirements(_AI_REQS, _TEMPLATE_REQS)
         
         # Should not include duplicate
         titles = [req["title"] for req in merged]
@@ -210,13 +246,7 @@ class TestAnalystAgent:
     
     def test_calculate_requirement_metrics(self, analyst_agent):
         """Test requirement metrics calculation"""
-        requirements = [
-            {"type": "functional", "priority": 1, "estimated_effort": "large"},
-            {"type": "functional", "priority": 2, "estimated_effort": "medium"},
-            {"type": "non_functional", "priority": 1, "estimated_effort": "small"}
-        ]
-        
-        metrics = analyst_agent._calculate_requirement_metrics(requirements)
+        metrics = analyst_agent._calculate_requirement_metrics(_MIXED_REQS)
         
         assert metrics["total"] == 3
         assert metrics["by_type"]["functional"] == 2
@@ -227,23 +257,15 @@ class TestAnalystAgent:
     
     def test_calculate_complexity_score(self, analyst_agent):
         """Test complexity score calculation"""
-        simple_requirements = [
-            {"priority": 3, "estimated_effort": "small"} for _ in range(5)
-        ]
-        
-        complex_requirements = [
-            {"priority": 1, "estimated_effort": "extra_large"} for _ in range(30)
-        ]
-        
-        simple_score = analyst_agent._calculate_complexity_score(simple_requirements)
-        complex_score = analyst_agent._calculate_complexity_score(complex_requirements)
+        simple_score = analyst_agent._calculate_complexity_score(_SIMPLE_REQS)
+        complex_score = analyst_agent._calculate_complexity_score(_COMPLEX_REQS)
         
         assert 1.0 <= simple_score <= 10.0
         assert 1.0 <= complex_score <= 10.0
         assert complex_score > simple_score
     
     @pytest.mark.asyncio
-    async def test_assess_technical_feasibility(self, analyst_agent):
+    async def test_assess_technical_feasibility(self, analyst_agent, mock_ollama):
         """Test technical feasibility assessment"""
         requirements = [
             {
@@ -268,32 +290,23 @@ class TestAnalystAgent:
             "team": {"size": "small"}
         }
         
-        with patch('agents.analyst.agent.ollama_client') as mock_client:
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.generate = AsyncMock(return_value={
-                'response': json.dumps({
-                    "level": "medium",
-                    "challenges": ["Complex implementation"],
-                    "risks": ["Timeline pressure"],
-                    "recommendations": ["Use proven technologies"]
-                })
-            })
-            
-            result = await analyst_agent.assess_technical_feasibility(requirements, constraints)
-            
-            assert "assessments" in result
-            assert "feasibility_distribution" in result
-            assert "overall_feasibility" in result
-            assert "resource_summary" in result
-            
-            assessments = result["assessments"]
-            assert len(assessments) == 2
-            
-            # Check assessment structure
-            for assessment in assessments:
-                assert "requirement_id" in assessment
-                assert "feasibility_level" in assessment
-                assert "technical_challenges" in assessment
+        mock_ollama.response = _MOCK_FEASIBILITY_RESPONSE
+        
+        result = await analyst_agent.assess_technical_feasibility(requirements, constraints)
+        
+        assert "assessments" in result
+        assert "feasibility_distribution" in result
+        assert "overall_feasibility" in result
+        assert "resource_summary" in result
+        
+        assessments = result["assessments"]
+        assert len(assessments) == 2
+        
+        # Check assessment structure
+        for assessment in assessments:
+            assert "requirement_id" in assessment
+            assert "feasibility_level" in assessment
+            assert "technical_challenges" in assessment
     
     def test_rule_based_feasibility(self, analyst_agent):
         """Test rule-based feasibility assessment"""
@@ -330,20 +343,14 @@ class TestAnalystAgent:
     
     def test_calculate_overall_feasibility(self, analyst_agent):
         """Test overall feasibility calculation"""
-        from agents.analyst.agent import FeasibilityAssessment
-        
         # Mostly high feasibility
-        high_assessments = [
-            Mock(feasibility_level=FeasibilityLevel.HIGH) for _ in range(8)
-        ] + [Mock(feasibility_level=FeasibilityLevel.MEDIUM) for _ in range(2)]
+        high_assessments = [_HIGH] * 8 + [_MEDIUM] * 2
         
         overall = analyst_agent._calculate_overall_feasibility(high_assessments)
         assert overall == "high"
         
         # Many low feasibility
-        low_assessments = [
-            Mock(feasibility_level=FeasibilityLevel.LOW) for _ in range(3)
-        ] + [Mock(feasibility_level=FeasibilityLevel.HIGH) for _ in range(2)]
+        low_assessments = [_LOW] * 3 + [_HIGH] * 2
         
         overall_low = analyst_agent._calculate_overall_feasibility(low_assessments)
         assert overall_low == "low"
@@ -422,7 +429,7 @@ class TestAnalystAgent:
         assert frontend["language"] == "JavaScript"  # Not TypeScript due to experience
     
     @pytest.mark.asyncio
-    async def test_process_task_requirements_analysis(self, analyst_agent):
+    async def test_process_task_requirements_analysis(self, analyst_agent, mock_ollama, tmp_path):
         """Test processing requirements analysis task"""
         task = {
             "title": "Requirements Analysis",
@@ -431,55 +438,34 @@ class TestAnalystAgent:
                 "stakeholders": ["users", "admin"],
                 "constraints": {"timeline": {"type": "normal"}}
             },
-            "output_dir": "/tmp/test_output"
+            "output_dir": str(tmp_path)
         }
         
-        with patch('agents.analyst.agent.ollama_client') as mock_client:
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.generate = AsyncMock(return_value={
-                'response': json.dumps({
-                    "requirements": [
-                        {
-                            "id": "REQ-001",
-                            "type": "functional",
-                            "title": "Test Requirement",
-                            "description": "Test description",
-                            "priority": 1,
-                            "acceptance_criteria": ["Test criteria"],
-                            "business_value": "Test value",
-                            "estimated_effort": "medium"
-                        }
-                    ]
-                })
-            })
-            
-            with patch('os.makedirs'):
-                with patch('builtins.open', create=True) as mock_open:
-                    mock_file = Mock()
-                    mock_open.return_value.__enter__.return_value = mock_file
-                    
-                    result = await analyst_agent.process_task(task)
-                    
-                    assert result["status"] == "completed"
-                    assert "files_created" in result
-                    assert "requirements_analysis" in result
-                    assert "feasibility_assessment" in result
-                    assert "architecture_recommendations" in result
-                    assert result["agent_id"] == "analyst"
-    
-    def test_infer_project_type_from_task(self, analyst_agent):
-        """Test project type inference from task"""
-        todo_task = {"title": "Todo App Analysis", "description": "Analyze todo application"}
-        assert analyst_agent._infer_project_type_from_task(todo_task) == "todo_application"
+        mock_ollama.response = _MOCK_REQUIREMENTS_RESPONSE
         
-        blog_task = {"title": "Blog System", "description": "Content management system"}
-        assert analyst_agent._infer_project_type_from_task(blog_task) == "blog_system"
+        result = await analyst_agent.process_task(task)
         
-        api_task = {"title": "API Service", "description": "REST API development"}
-        assert analyst_agent._infer_project_type_from_task(api_task) == "api_service"
+        assert result["status"] == "completed"
+        assert "files_created" in result
+        assert "requirements_analysis" in result
+        assert "feasibility_assessment" in result
+        assert "architecture_recommendations" in result
+        assert result["agent_id"] == "analyst"
         
-        web_task = {"title": "Web Application", "description": "General web app"}
-        assert analyst_agent._infer_project_type_from_task(web_task) == "web_application"
+        # Documents are written for real into the temporary output directory
+        assert (tmp_path / "docs" / "requirements_analysis.md").is_file()
+        assert len(result["files_created"]) == 4
+    
+    @pytest.mark.parametrize("title,description,expected", [
+        ("Todo App Analysis", "Analyze todo application", "todo_application"),
+        ("Blog System", "Content management system", "blog_system"),
+        ("API Service", "REST API development", "api_service"),
+        ("Web Application", "General web app", "web_application"),
+    ])
+    def test_infer_project_type_from_task(self, analyst_agent, title, description, expected):
+        """Test project type inference from task"""
+        task = {"title": title, "description": description}
+        assert analyst_agent._infer_project_type_from_task(task) == expected
     
     def test_generate_requirements_document(self, analyst_agent):
         """Test requirements document generation"""
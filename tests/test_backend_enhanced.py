@@ -3,21 +3,17 @@
 Tests for Enhanced Backend Agent (Task 5)
 """
 import pytest
-import asyncio
-import tempfile
+import copy
 import os
-import json
-from unittest.mock import Mock, patch, AsyncMock
-
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import uuid
 
 from agents.backend_enhanced import BackendEnhancedAgent
+from tests.helpers import assert_all_substrings
 
 class TestBackendEnhancedAgent:
     """Test cases for the Enhanced Backend Agent"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def agent_config(self):
         return {
             'agents': {
@@ -28,10 +24,28 @@ class TestBackendEnhancedAgent:
             }
         }
     
-    @pytest.fixture
+    # Shared agent for the read-only generator tests
+    @pytest.fixture(scope="session")
     def backend_agent(self, agent_config):
         return BackendEnhancedAgent(agent_config)
     
+    # process_task changes agent.status, those tests get a shallow copy of the shared agent
+    # (a new instance would also attach one more log handler to the shared logger)
+    @pytest.fixture
+    def fresh_agent(self, backend_agent):
+        return copy.copy(backend_agent)
+    
+    # One temp root for the session, every filesystem test writes into its own subdirectory
+    @pytest.fixture(scope="session")
+    def shared_tmp(self, tmp_path_factory):
+        return tmp_path_factory.mktemp("backend_enhanced")
+    
+    @pytest.fixture
+    def temp_dir(self, shared_tmp):
+        sub = shared_tmp / uuid.uuid4().hex
+        sub.mkdir()
+        return str(sub)
+    
     def test_initialization(self, backend_agent):
         """Test agent initialization"""
         assert backend_agent.agent_id == "backend_enhanced"
@@ -60,68 +74,38 @@ class TestBackendEnhancedAgent:
         for capability in expected_capabilities:
             assert capability in capabilities
     
-    def test_determine_framework(self, backend_agent):
+    @pytest.mark.parametrize("architecture,requirements,task,expected", [
+        ({"backend": "fastapi"}, {}, {}, "fastapi"),  # from architecture
+        ({}, {"framework": "flask", "lightweight": True}, {}, "flask"),  # from requirements
+        ({}, {}, {"title": "Create Django REST API"}, "django"),  # from task title
+        ({}, {}, {}, "fastapi"),  # default fallback
+    ])
+    def test_determine_framework(self, backend_agent, architecture, requirements, task, expected):
         """Test framework determination"""
-        # Test FastAPI detection
-        architecture = {"backend": "fastapi"}
-        framework = backend_agent._determine_framework(architecture, {}, {})
-        assert framework == "fastapi"
-        
-        # Test Flask detection from requirements
-        requirements = {"framework": "flask", "lightweight": True}
-        framework = backend_agent._determine_framework({}, requirements, {})
-        assert framework == "flask"
-        
-        # Test Django detection from task title
-        task = {"title": "Create Django REST API"}
-        framework = backend_agent._determine_framework({}, {}, task)
-        assert framework == "django"
-        
-        # Test default fallback
-        framework = backend_agent._determine_framework({}, {}, {})
-        assert framework == "fastapi"
-    
-    def test_determine_database(self, backend_agent):
+        assert backend_agent._determine_framework(architecture, requirements, task) == expected
+    
+    @pytest.mark.parametrize("requirements,expected", [
+        ({"database": "postgresql", "relational": True}, "postgresql"),
+        ({"db": "mysql", "sql": True}, "mysql"),
+        ({"database": "mongodb", "nosql": True}, "mongodb"),
+        ({}, "postgresql"),  # default
+    ])
+    def test_determine_database(self, backend_agent, requirements, expected):
         """Test database determination"""
-        # Test PostgreSQL detection
-        requirements = {"database": "postgresql", "relational": True}
-        database = backend_agent._determine_database(requirements)
-        assert database == "postgresql"
-        
-        # Test MySQL detection
-        requirements = {"db": "mysql", "sql": True}
-        database = backend_agent._determine_database(requirements)
-        assert database == "mysql"
-        
-        # Test MongoDB detection
-        requirements = {"database": "mongodb", "nosql": True}
-        database = backend_agent._determine_database(requirements)
-        assert database == "mongodb"
-        
-        # Test default
-        database = backend_agent._determine_database({})
-        assert database == "postgresql"
-    
-    def test_determine_auth_method(self, backend_agent):
+        assert backend_agent._determine_database(requirements) == expected
+    
+    @pytest.mark.parametrize("requirements,expected", [
+        ({"auth": "jwt", "tokens": True}, "jwt"),
+        ({"authentication": "oauth2", "google": True}, "oauth2"),
+        ({"api-key": True, "simple": True}, "api-key"),
+        ({"apikey": True}, "api-key"),
+        ({"auth": "session"}, "session"),
+        ({"auth": "oauth2 and jwt"}, "oauth2"),  # oauth wins over jwt
+        ({}, "jwt"),  # default
+    ])
+    def test_determine_auth_method(self, backend_agent, requirements, expected):
         """Test authentication method determination"""
-        # Test JWT detection
-        requirements = {"auth": "jwt", "tokens": True}
-        auth_method = backend_agent._determine_auth_method(requirements)
-        assert auth_method == "jwt"
-        
-        # Test OAuth2 detection
-        requirements = {"authentication": "oauth2", "google": True}
-        auth_method = backend_agent._determine_auth_method(requirements)
-        assert auth_method == "oauth2"
-        
-        # Test API key detection
-        requirements = {"api-key": True, "simple": True}
-        auth_method = backend_agent._determine_auth_method(requirements)
-        assert auth_method == "api-key"
-        
-        # Test default
-        auth_method = backend_agent._determine_auth_method({})
-        assert auth_method == "jwt"
+        assert backend_agent._determine_auth_method(requirements) == expected
     
     def test_determine_features(self, backend_agent):
         """Test feature determination"""
@@ -149,22 +133,18 @@ class TestBackendEnhancedAgent:
         features = ["cors", "swagger", "monitoring", "graphql", "websockets"]
         main_file = backend_agent._get_fastapi_main_file("postgresql", "jwt", features)
         
-        # Check basic FastAPI structure
-        assert "from fastapi import FastAPI" in main_file
-        assert "app = FastAPI(" in main_file
-        
-        # Check CORS middleware
-        assert "CORSMiddleware" in main_file
-        
-        # Check GraphQL integration
-        assert "graphql_router" in main_file
-        
-        # Check WebSocket integration
-        assert "websocket_router" in main_file
-        
-        # Check database information in response
-        assert '"database": "postgresql"' in main_file
-        assert '"authentication": "jwt"' in main_file
+        assert_all_substrings(main_file, (
+            # Basic FastAPI structure
+            "from fastapi import FastAPI",
+            "app = FastAPI(",
+            # CORS, GraphQL and WebSocket integration
+            "CORSMiddleware",
+            "graphql_router",
+            "websocket_router",
+            # Database information in response
+            '"database": "postgresql"',
+            '"authentication": "jwt"',
+        ))
     
     def test_get_fastapi_config_file(self, backend_agent):
         """Test FastAPI configuration file generation"""
@@ -243,53 +223,55 @@ class TestBackendEnhancedAgent:
         """Test todos router generation"""
         router = backend_agent._get_todos_router("postgresql", "jwt")
         
-        assert "router = APIRouter()" in router
-        assert "@router.get(\"/\"" in router
-        assert "@router.post(\"/\"" in router
-        assert "@router.get(\"/{todo_id}\"" in router
-        assert "@router.put(\"/{todo_id}\"" in router
-        assert "@router.delete(\"/{todo_id}\"" in router
-        
-        # Check filtering parameters
-        assert "completed: Optional[bool]" in router
-        assert "priority: Optional[str]" in router
-        assert "search: Optional[str]" in router
+        assert_all_substrings(router, (
+            "router = APIRouter()",
+            '@router.get("/"',
+            '@router.post("/"',
+            '@router.get("/{todo_id}"',
+            '@router.put("/{todo_id}"',
+            '@router.delete("/{todo_id}"',
+            # Filtering parameters
+            "completed: Optional[bool]",
+            "priority: Optional[str]",
+            "search: Optional[str]",
+        ))
     
     def test_get_pydantic_schemas(self, backend_agent):
         """Test Pydantic schemas generation"""
         schemas = backend_agent._get_pydantic_schemas()
         
-        # User schemas
-        assert "class UserBase(BaseModel):" in schemas
-        assert "class UserCreate(UserBase):" in schemas
-        assert "class UserResponse(UserBase):" in schemas
-        
-        # Todo schemas
-        assert "class TodoBase(BaseModel):" in schemas
-        assert "class TodoCreate(TodoBase):" in schemas
-        assert "class TodoUpdate(BaseModel):" in schemas
-        assert "class TodoResponse(TodoBase):" in schemas
-        
-        # Auth schemas
-        assert "class Token(BaseModel):" in schemas
-        assert "class TokenData(BaseModel):" in schemas
+        assert_all_substrings(schemas, (
+            # User schemas
+            "class UserBase(BaseModel):",
+            "class UserCreate(UserBase):",
+            "class UserResponse(UserBase):",
+            # Todo schemas
+            "class TodoBase(BaseModel):",
+            "class TodoCreate(TodoBase):",
+            "class TodoUpdate(BaseModel):",
+            "class TodoResponse(TodoBase):",
+            # Auth schemas
+            "class Token(BaseModel):",
+            "class TokenData(BaseModel):",
+        ))
     
     def test_get_crud_operations(self, backend_agent):
         """Test CRUD operations generation"""
         crud = backend_agent._get_crud_operations("postgresql")
         
-        assert "class TodoCRUD:" in crud
-        assert "def get_todo" in crud
-        assert "def get_user_todos" in crud
-        assert "def create_todo" in crud
-        assert "def update_todo" in crud
-        assert "def delete_todo" in crud
-        assert "def get_user_todo_stats" in crud
-        
-        # Check filtering logic
-        assert "completed is not None" in crud
-        assert "priority" in crud
-        assert "search" in crud
+        assert_all_substrings(crud, (
+            "class TodoCRUD:",
+            "def get_todo",
+            "def get_user_todos",
+            "def create_todo",
+            "def update_todo",
+            "def delete_todo",
+            "def get_user_todo_stats",
+            # Filtering logic
+            "completed is not None",
+            "priority",
+            "search",
+        ))
     
     def test_get_fastapi_middleware(self, backend_agent):
         """Test middleware generation"""
@@ -376,20 +358,31 @@ class TestBackendEnhancedAgent:
         assert "[loggers]" in alembic_config
         assert "keys = root,sqlalchemy,alembic" in alembic_config
     
+    def test_get_tests_conftest(self, backend_agent):
+        """Test generated conftest with the shared client and database fixtures"""
+        conftest = backend_agent._get_tests_conftest()
+        
+        assert "from fastapi.testclient import TestClient" in conftest
+        assert '@pytest.fixture(scope="session")\ndef client():' in conftest
+        assert "with TestClient(app) as test_client:" in conftest
+        assert "def db_session():" in conftest
+        assert "def test_user(db_session):" in conftest
+        
+        # Check test database setup
+        assert "SQLALCHEMY_DATABASE_URL" in conftest
+        assert "sqlite:///./test.db" in conftest
+    
     def test_get_main_tests(self, backend_agent):
         """Test main tests generation"""
         tests = backend_agent._get_main_tests()
         
-        assert "import pytest" in tests
-        assert "from fastapi.testclient import TestClient" in tests
-        assert "def test_read_root():" in tests
-        assert "def test_health_check():" in tests
-        assert "def test_register_user():" in tests
-        assert "def test_login_user():" in tests
+        assert "def test_read_root(client):" in tests
+        assert "def test_health_check(client):" in tests
+        assert "def test_register_user(client):" in tests
+        assert "def test_login_user(client):" in tests
         
-        # Check test database setup
-        assert "SQLALCHEMY_DATABASE_URL" in tests
-        assert "sqlite:///./test.db" in tests
+        # The client comes from the session fixture, not a module-level instance
+        assert "TestClient(app)" not in tests
     
     def test_get_auth_tests(self, backend_agent):
         """Test authentication tests generation"""
@@ -397,13 +390,20 @@ class TestBackendEnhancedAgent:
         
         assert "def test_create_access_token():" in auth_tests
         assert "def test_password_hashing():" in auth_tests
-        assert "def test_invalid_login():" in auth_tests
-        assert "def test_protected_route_without_token():" in auth_tests
+        assert "def test_invalid_login(client):" in auth_tests
+        assert "def test_protected_route_without_token(client):" in auth_tests
+        assert "TestClient(app)" not in auth_tests
         
         # Check JWT specific tests
         assert "verify_password" in auth_tests
         assert "get_password_hash" in auth_tests
     
+    def test_generated_tests_compile(self, backend_agent):
+        """Test generated test modules are valid Python"""
+        for source in (backend_agent._get_tests_conftest(), backend_agent._get_main_tests(),
+                       backend_agent._get_auth_tests("jwt"), backend_agent._get_crud_tests()):
+            compile(source, "<generated>", "exec")
+    
     def test_get_crud_tests(self, backend_agent):
         """Test CRUD tests generation"""
         crud_tests = backend_agent._get_crud_tests()
@@ -443,91 +443,103 @@ class TestBackendEnhancedAgent:
         assert "## WebSocket Support" in api_docs
     
     @pytest.mark.asyncio
-    async def test_create_advanced_fastapi_backend(self, backend_agent):
+    async def test_create_advanced_fastapi_backend(self, backend_agent, temp_dir):
         """Test advanced FastAPI backend creation"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            task = {
-                "title": "Advanced FastAPI Backend",
-                "description": "Create a comprehensive FastAPI backend",
-                "requirements": {
-                    "graphql": True,
-                    "websockets": True,
-                    "authentication": "jwt"
-                },
-                "output_dir": temp_dir
-            }
-            
-            result = await backend_agent._create_advanced_fastapi_backend(
-                task, temp_dir, "postgresql", "jwt", ["graphql", "websockets", "cors"]
-            )
-            
-            assert result["status"] == "completed"
-            assert result["technology"] == "FastAPI"
-            assert result["database"] == "postgresql"
-            assert result["authentication"] == "jwt"
-            assert "graphql" in result["features"]
-            assert len(result["files_created"]) > 20  # Should create many files
+        task = {
+            "title": "Advanced FastAPI Backend",
+            "description": "Create a comprehensive FastAPI backend",
+            "requirements": {
+                "graphql": True,
+                "websockets": True,
+                "authentication": "jwt"
+            },
+            "output_dir": temp_dir
+        }
+        
+        # Only plan the files, writing them is covered by test_process_task
+        result = await backend_agent._create_advanced_fastapi_backend(
+            task, temp_dir, "postgresql", "jwt", ["graphql", "websockets", "cors"], dry_run=True
+        )
+        
+        assert result["status"] == "planned"
+        assert result["technology"] == "FastAPI"
+        assert result["database"] == "postgresql"
+        assert result["authentication"] == "jwt"
+        assert "graphql" in result["features"]
+        assert len(result["files_planned"]) > 20  # Should plan many files
+        assert result["files_created"] == []
+        assert os.listdir(temp_dir) == []
     
     @pytest.mark.asyncio
-    async def test_create_advanced_flask_backend(self, backend_agent):
+    async def test_create_advanced_fastapi_backend_precompile(self, backend_agent, temp_dir):
+        """Test generated Python files are byte-compiled on request"""
+        result = await backend_agent._create_advanced_fastapi_backend(
+            {"title": "Precompiled Backend"}, temp_dir, "postgresql", "jwt", ["graphql"], precompile=True
+        )
+        
+        backend_dir = result["output_directory"]
+        assert any(name.startswith("main.") for name in os.listdir(os.path.join(backend_dir, "__pycache__")))
+        assert os.path.isdir(os.path.join(backend_dir, "routers", "__pycache__"))
+    
+    @pytest.mark.asyncio
+    async def test_create_advanced_flask_backend(self, backend_agent, temp_dir):
         """Test Flask backend creation placeholder"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            task = {"title": "Flask API", "output_dir": temp_dir}
-            
-            result = await backend_agent._create_advanced_flask_backend(
-                task, temp_dir, "postgresql", "jwt", []
-            )
-            
-            assert result["status"] == "completed"
-            assert result["technology"] == "Flask"
-            assert "Flask backend implementation available" in result["message"]
+        task = {"title": "Flask API", "output_dir": temp_dir}
+        
+        result = await backend_agent._create_advanced_flask_backend(
+            task, temp_dir, "postgresql", "jwt", []
+        )
+        
+        assert result["status"] == "completed"
+        assert result["technology"] == "Flask"
+        assert "Flask backend implementation available" in result["message"]
     
     @pytest.mark.asyncio
-    async def test_create_advanced_django_backend(self, backend_agent):
+    async def test_create_advanced_django_backend(self, backend_agent, temp_dir):
         """Test Django backend creation placeholder"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            task = {"title": "Django API", "output_dir": temp_dir}
-            
-            result = await backend_agent._create_advanced_django_backend(
-                task, temp_dir, "postgresql", "jwt", []
-            )
-            
-            assert result["status"] == "completed"
-            assert result["technology"] == "Django"
-            assert "Django backend implementation available" in result["message"]
+        task = {"title": "Django API", "output_dir": temp_dir}
+        
+        result = await backend_agent._create_advanced_django_backend(
+            task, temp_dir, "postgresql", "jwt", []
+        )
+        
+        assert result["status"] == "completed"
+        assert result["technology"] == "Django"
+        assert "Django backend implementation available" in result["message"]
     
     @pytest.mark.asyncio
-    async def test_process_task(self, backend_agent):
+    async def test_process_task(self, fresh_agent, temp_dir):
         """Test task processing"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            task = {
-                "title": "Create advanced API",
-                "description": "FastAPI with GraphQL and JWT auth",
-                "architecture": {"backend": "fastapi"},
-                "requirements": {"graphql": True, "jwt": True},
-                "output_dir": temp_dir
-            }
-            
-            result = await backend_agent.process_task(task)
-            
-            assert result["status"] == "completed"
-            assert result["technology"] == "FastAPI"
-            assert backend_agent.status == "idle"
+        task = {
+            "title": "Create advanced API",
+            "description": "FastAPI with GraphQL and JWT auth",
+            "architecture": {"backend": "fastapi"},
+            "requirements": {"graphql": True, "jwt": True},
+            "output_dir": temp_dir
+        }
+        
+        result = await fresh_agent.process_task(task)
+        
+        assert result["status"] == "completed"
+        assert result["technology"] == "FastAPI"
+        assert len(result["files_created"]) > 20
+        assert all(os.path.isfile(path) for path in result["files_created"])
+        assert fresh_agent.status == "idle"
     
     @pytest.mark.asyncio
-    async def test_process_task_error_handling(self, backend_agent):
+    async def test_process_task_error_handling(self, fresh_agent):
         """Test error handling in task processing"""
         task = {
             "title": "Broken task",
             "output_dir": "/invalid/path/that/does/not/exist"
         }
         
-        result = await backend_agent.process_task(task)
+        result = await fresh_agent.process_task(task)
         
         assert result["status"] == "error"
         assert "message" in result
         assert result["files_created"] == []
-        assert backend_agent.status == "error"
+        assert fresh_agent.status == "error"
     
     def test_mongodb_database_file(self, backend_agent):
         """Test MongoDB database configuration"""
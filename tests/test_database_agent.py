@@ -1,17 +1,85 @@
 
 """
 Tests for Database Agent
+
+Pure unit tests: Ollama is faked and files only go to tmp_path. Quick run:
+    python -m pytest -m fast -p no:cacheprovider --no-header -q tests/test_database_agent.py
 """
 import pytest
-import asyncio
+import copy
 import json
-import os
-import tempfile
-from unittest.mock import Mock, AsyncMock, patch
-from agents.database.agent import DatabaseAgent, DatabaseType, IndexType
+from types import MappingProxyType
+from agents.database.agent import DatabaseAgent
+from tests.helpers import FakeOllama, assert_all_substrings
+
+pytestmark = pytest.mark.fast
+
+# Canned Ollama schema response, serialized once at import
+_MOCK_AI_RESPONSE = MappingProxyType({
+    'response': json.dumps({
+        "tables": {
+            "products": {
+                "columns": [
+                    {"name": "id", "type": "INTEGER", "primary_key": True},
+                    {"name": "name", "type": "VARCHAR(255)", "not_null": True}
+                ],
+                "indexes": [
+                    {"name": "idx_products_name", "columns": ["name"], "type": "btree"}
+                ]
+            }
+        }
+    })
+})
+
+# Shared read-only inputs for the SQL and scoring helpers
+_CREATE_TABLE_DEF = MappingProxyType({
+    "columns": [
+        {"name": "id", "type": "INTEGER", "primary_key": True, "auto_increment": True},
+        {"name": "name", "type": "VARCHAR(100)", "not_null": True, "unique": True},
+        {"name": "created_at", "type": "TIMESTAMP", "default": "CURRENT_TIMESTAMP"}
+    ],
+    "foreign_keys": [
+        {"column": "user_id", "references": "users(id)", "on_delete": "CASCADE"}
+    ]
+})
+
+_EXPECTED_CREATE_TABLE = (
+    "CREATE TABLE test_table",
+    "id SERIAL PRIMARY KEY",
+    "name VARCHAR(100) NOT NULL UNIQUE",
+    "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+    "FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE",
+)
+
+# database_type, project_type, tokens the generated database.py must contain
+_DB_PY_CASES = (
+    ("sqlite", "todo_application", ("import sqlite3", "class Database:", "get_connection", "execute_query")),
+    ("postgresql", "web_application", ("asyncpg", "create_pool", "async def")),
+)
+
+_GOOD_SCHEMA = MappingProxyType({
+    "tables": {
+        "users": {
+            "columns": [
+                {"name": "id", "type": "INTEGER", "primary_key": True},
+                {"name": "created_at", "type": "TIMESTAMP"},
+                {"name": "updated_at", "type": "TIMESTAMP"}
+            ],
+            "indexes": [
+                {"name": "idx_users_created_at", "columns": ["created_at"]}
+            ],
+            "foreign_keys": [
+                {"column": "role_id", "references": "roles(id)"}
+            ],
+            "constraints": [
+                {"type": "check", "definition": "created_at <= CURRENT_TIMESTAMP"}
+            ]
+        }
+    }
+})
 
 class TestDatabaseAgent:
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def config(self):
         return {
             'agents': {
@@ -21,10 +89,26 @@ class TestDatabaseAgent:
             }
         }
     
-    @pytest.fixture
+    # Shared by all tests, _verify_agent_immutable guards against leaking state
+    @pytest.fixture(scope="session")
     def database_agent(self, config):
         return DatabaseAgent(config)
     
+    @pytest.fixture
+    def mock_ollama(self, monkeypatch):
+        """Replace the shared Ollama client; tests set .response"""
+        client = FakeOllama()
+        monkeypatch.setattr("agents.database.agent.ollama_client", client)
+        return client
+    
+    @pytest.fixture(autouse=True)
+    def _verify_agent_immutable(self, database_agent):
+        templates = copy.deepcopy(database_agent.schema_templates)
+        rules = copy.deepcopy(database_agent.optimization_rules)
+        yield
+        assert database_agent.schema_templates == templates
+        assert database_agent.optimization_rules == rules
+    
     def test_initialization(self, database_agent):
         """Test database agent initialization"""
         assert database_agent.agent_id == "database"
@@ -44,16 +128,15 @@ class TestDatabaseAgent:
             "data_modeling"
         ]
         
-        for capability in expected_capabilities:
-            assert capability in capabilities
+        missing = set(expected_capabilities) - set(capabilities)
+        assert not missing, f"missing capabilities: {missing}"
     
     def test_schema_templates(self, database_agent):
         """Test schema templates initialization"""
         templates = database_agent.schema_templates
         
-        assert "user_management" in templates
-        assert "todo_application" in templates
-        assert "blog_system" in templates
+        missing = {"user_management", "todo_application", "blog_system"} - templates.keys()
+        assert not missing, f"missing templates: {missing}"
         
         # Test user_management template structure
         user_mgmt = templates["user_management"]
@@ -105,7 +188,7 @@ class TestDatabaseAgent:
         assert any("todo" in table_name.lower() for table_name in tables.keys())
     
     @pytest.mark.asyncio
-    async def test_generate_schema_with_ai(self, database_agent):
+    async def test_generate_schema_with_ai(self, database_agent, mock_ollama):
         """Test schema generation with AI fallback"""
         requirements = {
             "project_type": "custom_app",  # Not in templates
@@ -115,99 +198,34 @@ class TestDatabaseAgent:
             "relationships": [{"from": "orders", "to": "products", "type": "many_to_one"}]
         }
         
-        mock_ai_response = {
-            "tables": {
-                "products": {
-                    "columns": [
-                        {"name": "id", "type": "INTEGER", "primary_key": True},
-                        {"name": "name", "type": "VARCHAR(255)", "not_null": True}
-                    ],
-                    "indexes": [
-                        {"name": "idx_products_name", "columns": ["name"], "type": "btree"}
-                    ]
-                }
-            }
-        }
+        mock_ollama.response = _MOCK_AI_RESPONSE
+        
+        result = await database_agent.generate_schema(requirements)
         
-        with patch('agents.database.agent.ollama_client') as mock_client:
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.generate = AsyncMock(return_value={
-                'response': json.dumps(mock_ai_response)
-            })
-            
-            result = await database_agent.generate_schema(requirements)
-            
-            assert result["database_type"] == "mysql"
-            schema = result["schema"]
-            assert "products" in schema["tables"]
+        assert result["database_type"] == "mysql"
+        schema = result["schema"]
+        assert "products" in schema["tables"]
     
     def test_create_table_sql_generation(self, database_agent):
         """Test CREATE TABLE SQL generation"""
-        table_def = {
-            "columns": [
-                {"name": "id", "type": "INTEGER", "primary_key": True, "auto_increment": True},
-                {"name": "name", "type": "VARCHAR(100)", "not_null": True, "unique": True},
-                {"name": "created_at", "type": "TIMESTAMP", "default": "CURRENT_TIMESTAMP"}
-            ],
-            "foreign_keys": [
-                {"column": "user_id", "references": "users(id)", "on_delete": "CASCADE"}
-            ]
-        }
-        
-        sql = database_agent._generate_create_table_sql("test_table", table_def, "postgresql")
+        sql = database_agent._generate_create_table_sql("test_table", _CREATE_TABLE_DEF, "postgresql")
         
-        assert "CREATE TABLE test_table" in sql
-        assert "id SERIAL PRIMARY KEY" in sql
-        assert "name VARCHAR(100) NOT NULL UNIQUE" in sql
-        assert "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP" in sql
-        assert "FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE" in sql
+        assert_all_substrings(sql, _EXPECTED_CREATE_TABLE)
     
-    def test_create_index_sql_generation(self, database_agent):
+    @pytest.mark.parametrize("index_def,expected", [
+        ({"name": "idx_test_name", "columns": ["name", "created_at"], "type": "btree"},
+         "CREATE INDEX idx_test_name ON test_table (name, created_at)"),
+        ({"name": "idx_test_unique", "columns": ["email"], "type": "unique"},
+         "CREATE UNIQUE INDEX"),
+    ], ids=["btree", "unique"])
+    def test_create_index_sql_generation(self, database_agent, index_def, expected):
         """Test CREATE INDEX SQL generation"""
-        index_def = {
-            "name": "idx_test_name",
-            "columns": ["name", "created_at"],
-            "type": "btree"
-        }
-        
         sql = database_agent._generate_create_index_sql("test_table", index_def, "postgresql")
-        
-        assert "CREATE INDEX idx_test_name ON test_table (name, created_at)" in sql
-        
-        # Test unique index
-        unique_index = {
-            "name": "idx_test_unique",
-            "columns": ["email"],
-            "type": "unique"
-        }
-        
-        unique_sql = database_agent._generate_create_index_sql("test_table", unique_index, "postgresql")
-        assert "CREATE UNIQUE INDEX" in unique_sql
+        assert expected in sql
     
     def test_optimization_score_calculation(self, database_agent):
         """Test optimization score calculation"""
-        good_schema = {
-            "tables": {
-                "users": {
-                    "columns": [
-                        {"name": "id", "type": "INTEGER", "primary_key": True},
-                        {"name": "created_at", "type": "TIMESTAMP"},
-                        {"name": "updated_at", "type": "TIMESTAMP"}
-                    ],
-                    "indexes": [
-                        {"name": "idx_users_created_at", "columns": ["created_at"]}
-                    ],
-                    "foreign_keys": [
-                        {"column": "role_id", "references": "roles(id)"}
-                    ],
-                    "constraints": [
-                        {"type": "check", "definition": "created_at <= CURRENT_TIMESTAMP"}
-                    ]
-                }
-            }
-        }
-        
-        score = database_agent._calculate_optimization_score(good_schema)
+        score = database_agent._calculate_optimization_score(_GOOD_SCHEMA)
         assert 0 <= score <= 100
         assert score > 50  # Should be reasonably good
         
@@ -245,82 +263,58 @@ class TestDatabaseAgent:
         findings = analysis["findings"]
         assert any("foreign key" in finding.get("description", "").lower() for finding in findings)
     
-    def test_apply_optimization_rule_foreign_key_without_index(self, database_agent):
-        """Test foreign key without index rule"""
-        rule = {
-            "name": "missing_index_on_foreign_key",
-            "severity": "high", 
-            "check": "foreign_key_without_index"
-        }
-        
-        schema = {
-            "tables": {
-                "orders": {
-                    "foreign_keys": [
-                        {"column": "user_id", "references": "users(id)"}
-                    ],
-                    "indexes": []  # No indexes
-                }
-            }
-        }
-        
+    @pytest.mark.parametrize("rule,schema,expected,description", [
+        (
+            {"name": "missing_index_on_foreign_key", "severity": "high", "check": "foreign_key_without_index"},
+            {"tables": {"orders": {
+                "foreign_keys": [{"column": "user_id", "references": "users(id)"}],
+                "indexes": []  # No indexes
+            }}},
+            {"severity": "high", "table": "orders", "column": "user_id"},
+            "foreign key",
+        ),
+        (
+            {"name": "missing_primary_key", "severity": "high", "check": "table_without_primary_key"},
+            {"tables": {"logs": {
+                # No primary key defined
+                "columns": [
+                    {"name": "message", "type": "TEXT"},
+                    {"name": "created_at", "type": "TIMESTAMP"}
+                ]
+            }}},
+            {"table": "logs"},
+            "primary key",
+        ),
+    ], ids=["fk_without_index", "missing_pk"])
+    def test_apply_optimization_rule(self, database_agent, rule, schema, expected, description):
+        """Test single optimization rules"""
         findings = database_agent._apply_optimization_rule(rule, schema)
         
         assert len(findings) == 1
         finding = findings[0]
-        assert finding["severity"] == "high"
-        assert finding["table"] == "orders"
-        assert finding["column"] == "user_id"
-    
-    def test_apply_optimization_rule_missing_primary_key(self, database_agent):
-        """Test missing primary key rule"""
-        rule = {
-            "name": "missing_primary_key",
-            "severity": "high",
-            "check": "table_without_primary_key"
-        }
-        
-        schema = {
-            "tables": {
-                "logs": {
-                    "columns": [
-                        {"name": "message", "type": "TEXT"},
-                        {"name": "created_at", "type": "TIMESTAMP"}
-                    ]
-                    # No primary key defined
-                }
-            }
-        }
-        
-        findings = database_agent._apply_optimization_rule(rule, schema)
-        
-        assert len(findings) == 1
-        finding = findings[0]
-        assert finding["table"] == "logs"
-        assert "primary key" in finding["description"].lower()
+        assert finding.items() >= expected.items()
+        assert description in finding["description"].lower()
     
     @pytest.mark.asyncio
-    async def test_process_task_schema_creation(self, database_agent):
+    async def test_process_task_schema_creation(self, database_agent, mock_ollama, tmp_path):
         """Test processing schema creation task"""
         task = {
             "title": "Setup Database Schema",
             "description": "Create database schema for todo application",
             "requirements": {"database": "sqlite"},
-            "output_dir": "/tmp/test_output"
+            "output_dir": str(tmp_path)
         }
         
-        with patch('agents.database.agent.ollama_client'):
-            with patch('os.makedirs'):
-                with patch('builtins.open', create=True) as mock_open:
-                    mock_file = Mock()
-                    mock_open.return_value.__enter__.return_value = mock_file
-                    
-                    result = await database_agent.process_task(task)
-                    
-                    assert result["status"] == "completed"
-                    assert "files_created" in result
-                    assert "schema" in result
-                    assert result["agent_id"] == "database"
+        result = await database_agent.process_task(task)
+        
+        assert result["status"] == "completed"
+        assert "schema" in result
+        assert result["agent_id"] == "database"
+        
+        backend_dir = tmp_path / "backend"
+        assert list(tmp_path.iterdir()) == [backend_dir]
+        assert {p.name for p in backend_dir.iterdir()} == {"database.py", "models.py", "init_db.sql"}
+        assert sorted(result["files_created"]) == sorted(str(p) for p in backend_dir.iterdir())
     
     def test_infer_project_type(self, database_agent):
         """Test project type inference"""
@@ -361,32 +355,18 @@ class TestDatabaseAgent:
         assert "posts" in entities
         assert "comments" in entities
     
-    def test_generate_database_py_sqlite(self, database_agent):
-        """Test database.py generation for SQLite"""
-        schema_result = {
-            "database_type": "sqlite",
-            "migration_scripts": ["CREATE TABLE test..."]
-        }
-        
-        db_py = database_agent._generate_database_py(schema_result, "todo_application")
-        
-        assert "import sqlite3" in db_py
-        assert "class Database:" in db_py
-        assert "get_connection" in db_py
-        assert "execute_query" in db_py
-    
-    def test_generate_database_py_postgresql(self, database_agent):
-        """Test database.py generation for PostgreSQL"""
+    @pytest.mark.parametrize("database_type,project_type,expected_tokens", _DB_PY_CASES,
+                             ids=[case[0] for case in _DB_PY_CASES])
+    def test_generate_database_py(self, database_agent, database_type, project_type, expected_tokens):
+        """Test database.py generation per database type"""
         schema_result = {
-            "database_type": "postgresql",
+            "database_type": database_type,
             "migration_scripts": ["CREATE TABLE test..."]
         }
         
-        db_py = database_agent._generate_database_py(schema_result, "web_application")
+        db_py = database_agent._generate_database_py(schema_result, project_type)
         
-        assert "asyncpg" in db_py
-        assert "create_pool" in db_py
-        assert "async def" in db_py
+        assert_all_substrings(db_py, expected_tokens)
     
     def test_generate_models_py(self, database_agent):
         """Test models.py generation"""
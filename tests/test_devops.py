@@ -3,21 +3,93 @@
 Tests for DevOps Agent (Task 6)
 """
 import pytest
-import asyncio
-import tempfile
-import os
+import copy
+import json
+import re
 import yaml
-from unittest.mock import Mock, patch
-
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from types import MappingProxyType
+from unittest.mock import mock_open, patch
 
 from agents.devops import DevOpsAgent
+from tests.helpers import assert_all_substrings
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# libyaml via PyYAML, else ruamel.yaml (its own C extension), else pure Python
+_YAML_ERRORS = (yaml.YAMLError,)
+if hasattr(yaml, "CSafeLoader"):
+    def _load(text):
+        return yaml.load(text, Loader=yaml.CSafeLoader)
+    
+    def _load_all(text):
+        return yaml.load_all(text, Loader=yaml.CSafeLoader)
+else:
+    try:
+        from ruamel.yaml import YAML
+        from ruamel.yaml.error import YAMLError
+    except ImportError:
+        def _load(text):
+            return yaml.load(text, Loader=yaml.SafeLoader)
+        
+        def _load_all(text):
+            return yaml.load_all(text, Loader=yaml.SafeLoader)
+    else:
+        _ruamel = YAML(typ="safe", pure=False)
+        _load = _ruamel.load
+        _load_all = _ruamel.load_all
+        _YAML_ERRORS += (YAMLError,)
+
+# Generated files the tests check as parsed dicts rather than strings
+_PARSED_YAML_FILES = (
+    "docker/docker-compose.yml",
+    "helm/Chart.yaml",
+    "helm/values.yaml",
+    "ansible/inventory.yml",
+    "monitoring/prometheus-config.yml",
+    "monitoring/alert_rules.yml",
+    "logging/logstash/config/logstash.yml",
+    "logging/filebeat/filebeat.yml",
+)
+
+_EXPECTED_CAPABILITIES = frozenset({
+    "docker_containerization",
+    "multi_stage_docker_builds",
+    "docker_optimization",
+    "kubernetes_manifests",
+    "helm_charts",
+    "ci_cd_pipeline_generation",
+    "github_actions_workflows",
+    "gitlab_ci_pipelines",
+    "jenkins_pipelines",
+    "infrastructure_as_code",
+    "terraform_templates",
+    "ansible_playbooks",
+    "monitoring_setup",
+    "prometheus_grafana_config",
+    "elk_stack_setup",
+})
+
+_EXPECTED_SETUP_FEATURES = frozenset({
+    "Multi-stage Docker builds",
+    "Kubernetes manifests",
+    "Helm charts",
+    "CI/CD pipelines",
+    "Infrastructure as Code",
+    "Monitoring setup",
+})
+
+# Shebang at the start and "set -e" on its own line, checked in one scan
+_SCRIPT_HEADER = re.compile(r"\A#!/bin/bash.*^set -e", re.MULTILINE | re.DOTALL)
+_SCRIPT_FUNCTIONS = re.compile(r"^\s*(\w+)\(\)", re.MULTILINE)
 
 class TestDevOpsAgent:
     """Test cases for the DevOps Agent"""
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def agent_config(self):
         return {
             'agents': {
@@ -28,10 +100,67 @@ class TestDevOpsAgent:
             }
         }
     
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def devops_agent(self, agent_config):
         return DevOpsAgent(agent_config)
     
+    @pytest.fixture
+    def fresh_agent(self, devops_agent):
+        """Shallow copy for tests that mutate agent.status"""
+        return copy.copy(devops_agent)
+    
+    # The generators are deterministic, so build each bundle once per session
+    @pytest.fixture(scope="session")
+    def devops_task(self):
+        return MappingProxyType({"title": "test-app"})
+    
+    @pytest.fixture(scope="session")
+    def docker_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_docker_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def k8s_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_kubernetes_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def helm_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_helm_chart_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def github_actions_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_github_actions_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def terraform_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_terraform_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def ansible_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_ansible_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def monitoring_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_prometheus_grafana_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def elk_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_elk_stack_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def additional_files(self, devops_agent, devops_task):
+        return MappingProxyType(devops_agent._get_additional_devops_files(devops_task))
+    
+    @pytest.fixture(scope="session")
+    def parsed_yaml(self, docker_files, helm_files, ansible_files, monitoring_files, elk_files):
+        """Structurally checked YAML files, parsed once per session"""
+        bundles = (docker_files, helm_files, ansible_files, monitoring_files, elk_files)
+        return MappingProxyType({
+            path: _load(bundle[path])
+            for bundle in bundles
+            for path in _PARSED_YAML_FILES
+            if path in bundle
+        })
+    
     def test_initialization(self, devops_agent):
         """Test agent initialization"""
         assert devops_agent.agent_id == "devops"
@@ -44,118 +173,33 @@ class TestDevOpsAgent:
     
     def test_capabilities(self, devops_agent):
         """Test agent capabilities"""
-        capabilities = devops_agent.get_capabilities()
-        
-        expected_capabilities = [
-            "docker_containerization",
-            "multi_stage_docker_builds",
-            "docker_optimization",
-            "kubernetes_manifests",
-            "helm_charts",
-            "ci_cd_pipeline_generation",
-            "github_actions_workflows",
-            "gitlab_ci_pipelines",
-            "jenkins_pipelines",
-            "infrastructure_as_code",
-            "terraform_templates",
-            "ansible_playbooks",
-            "monitoring_setup",
-            "prometheus_grafana_config",
-            "elk_stack_setup"
-        ]
-        
-        for capability in expected_capabilities:
-            assert capability in capabilities
-    
-    def test_determine_container_platform(self, devops_agent):
-        """Test container platform determination"""
-        # Test Docker detection
-        requirements = {"containerization": "docker", "containers": True}
-        platform = devops_agent._determine_container_platform(requirements)
-        assert platform == "docker"
-        
-        # Test Podman detection
-        requirements = {"container": "podman", "rootless": True}
-        platform = devops_agent._determine_container_platform(requirements)
-        assert platform == "podman"
-        
-        # Test default
-        platform = devops_agent._determine_container_platform({})
-        assert platform == "docker"
-    
-    def test_determine_orchestrator(self, devops_agent):
-        """Test orchestrator determination"""
-        # Test Kubernetes detection
-        requirements = {"orchestration": "kubernetes", "k8s": True}
-        orchestrator = devops_agent._determine_orchestrator(requirements)
-        assert orchestrator == "kubernetes"
-        
-        # Test Docker Swarm detection
-        requirements = {"swarm": True, "docker-swarm": True}
-        orchestrator = devops_agent._determine_orchestrator(requirements)
-        assert orchestrator == "docker-swarm"
-        
-        # Test default
-        orchestrator = devops_agent._determine_orchestrator({})
-        assert orchestrator == "kubernetes"
-    
-    def test_determine_ci_cd_platform(self, devops_agent):
-        """Test CI/CD platform determination"""
-        # Test GitHub Actions detection
-        requirements = {"ci": "github actions", "github": True}
-        ci_cd = devops_agent._determine_ci_cd_platform(requirements)
-        assert ci_cd == "github-actions"
-        
-        # Test GitLab CI detection
-        requirements = {"pipeline": "gitlab ci", "gitlab": True}
-        ci_cd = devops_agent._determine_ci_cd_platform(requirements)
-        assert ci_cd == "gitlab-ci"
-        
-        # Test Jenkins detection
-        requirements = {"jenkins": True, "build": "jenkins"}
-        ci_cd = devops_agent._determine_ci_cd_platform(requirements)
-        assert ci_cd == "jenkins"
-        
-        # Test default
-        ci_cd = devops_agent._determine_ci_cd_platform({})
-        assert ci_cd == "github-actions"
-    
-    def test_determine_iac_tool(self, devops_agent):
-        """Test Infrastructure as Code tool determination"""
-        # Test Terraform detection
-        requirements = {"infrastructure": "terraform", "iac": "terraform"}
-        iac = devops_agent._determine_iac_tool(requirements)
-        assert iac == "terraform"
-        
-        # Test Ansible detection
-        requirements = {"config": "ansible", "playbooks": True}
-        iac = devops_agent._determine_iac_tool(requirements)
-        assert iac == "ansible"
-        
-        # Test default
-        iac = devops_agent._determine_iac_tool({})
-        assert iac == "terraform"
-    
-    def test_determine_monitoring_stack(self, devops_agent):
-        """Test monitoring stack determination"""
-        # Test Prometheus/Grafana detection
-        requirements = {"monitoring": "prometheus", "grafana": True}
-        monitoring = devops_agent._determine_monitoring_stack(requirements)
-        assert monitoring == "prometheus-grafana"
-        
-        # Test ELK Stack detection
-        requirements = {"logging": "elk", "elasticsearch": True}
-        monitoring = devops_agent._determine_monitoring_stack(requirements)
-        assert monitoring == "elk-stack"
-        
-        # Test default
-        monitoring = devops_agent._determine_monitoring_stack({})
-        assert monitoring == "prometheus-grafana"
-    
-    def test_get_docker_files(self, devops_agent):
+        missing = _EXPECTED_CAPABILITIES - set(devops_agent.get_capabilities())
+        assert not missing, f"missing capabilities: {missing}"
+    
+    @pytest.mark.parametrize("method,requirements,expected", [
+        ("_determine_container_platform", {"containerization": "docker", "containers": True}, "docker"),
+        ("_determine_container_platform", {"container": "podman", "rootless": True}, "podman"),
+        ("_determine_container_platform", {}, "docker"),  # default
+        ("_determine_orchestrator", {"orchestration": "kubernetes", "k8s": True}, "kubernetes"),
+        ("_determine_orchestrator", {"swarm": True, "docker-swarm": True}, "docker-swarm"),
+        ("_determine_orchestrator", {}, "kubernetes"),  # default
+        ("_determine_ci_cd_platform", {"ci": "github actions", "github": True}, "github-actions"),
+        ("_determine_ci_cd_platform", {"pipeline": "gitlab ci", "gitlab": True}, "gitlab-ci"),
+        ("_determine_ci_cd_platform", {"jenkins": True, "build": "jenkins"}, "jenkins"),
+        ("_determine_ci_cd_platform", {}, "github-actions"),  # default
+        ("_determine_iac_tool", {"infrastructure": "terraform", "iac": "terraform"}, "terraform"),
+        ("_determine_iac_tool", {"config": "ansible", "playbooks": True}, "ansible"),
+        ("_determine_iac_tool", {}, "terraform"),  # default
+        ("_determine_monitoring_stack", {"monitoring": "prometheus", "grafana": True}, "prometheus-grafana"),
+        ("_determine_monitoring_stack", {"logging": "elk", "elasticsearch": True}, "elk-stack"),
+        ("_determine_monitoring_stack", {}, "prometheus-grafana"),  # default
+    ])
+    def test_determine(self, devops_agent, method, requirements, expected):
+        """Test platform, orchestrator, CI/CD, IaC and monitoring determination"""
+        assert getattr(devops_agent, method)(requirements) == expected
+    
+    def test_get_docker_files(self, docker_files):
         """Test Docker configuration files generation"""
-        task = {"title": "Test App"}
-        docker_files = devops_agent._get_docker_files(task)
         
         # Check required Docker files
         assert "docker/Dockerfile.frontend" in docker_files
@@ -177,10 +221,8 @@ class TestDevOpsAgent:
         assert "FROM python:3.11-slim" in backend_dockerfile
         assert "COPY --from=builder" in backend_dockerfile
     
-    def test_get_kubernetes_files(self, devops_agent):
+    def test_get_kubernetes_files(self, k8s_files):
         """Test Kubernetes manifest files generation"""
-        task = {"title": "test-app"}
-        k8s_files = devops_agent._get_kubernetes_files(task)
         
         # Check required Kubernetes files
         assert "k8s/namespace.yaml" in k8s_files
@@ -195,89 +237,65 @@ class TestDevOpsAgent:
         assert "k8s/network-policy.yaml" in k8s_files
         
         # Check namespace content
-        namespace = k8s_files["k8s/namespace.yaml"]
-        assert "apiVersion: v1" in namespace
-        assert "kind: Namespace" in namespace
-        assert "name: test-app" in namespace
+        assert_all_substrings(k8s_files["k8s/namespace.yaml"], [
+            "apiVersion: v1", "kind: Namespace", "name: test-app",
+        ])
         
         # Check deployment content
-        backend_deployment = k8s_files["k8s/backend.yaml"]
-        assert "apiVersion: apps/v1" in backend_deployment
-        assert "kind: Deployment" in backend_deployment
-        assert "replicas: 3" in backend_deployment
-        assert "livenessProbe:" in backend_deployment
-        assert "readinessProbe:" in backend_deployment
+        assert_all_substrings(k8s_files["k8s/backend.yaml"], [
+            "apiVersion: apps/v1", "kind: Deployment", "replicas: 3",
+            "livenessProbe:", "readinessProbe:",
+        ])
         
         # Check HPA content
-        hpa = k8s_files["k8s/hpa.yaml"]
-        assert "apiVersion: autoscaling/v2" in hpa
-        assert "kind: HorizontalPodAutoscaler" in hpa
-        assert "minReplicas:" in hpa
-        assert "maxReplicas:" in hpa
+        assert_all_substrings(k8s_files["k8s/hpa.yaml"], [
+            "apiVersion: autoscaling/v2", "kind: HorizontalPodAutoscaler",
+            "minReplicas:", "maxReplicas:",
+        ])
     
-    def test_get_helm_chart_files(self, devops_agent):
+    def test_get_helm_chart_files(self, helm_files, parsed_yaml):
         """Test Helm chart files generation"""
-        task = {"title": "test-app"}
-        helm_files = devops_agent._get_helm_chart_files(task)
         
         # Check required Helm files
-        assert "helm/Chart.yaml" in helm_files
-        assert "helm/values.yaml" in helm_files
-        assert "helm/templates/deployment-frontend.yaml" in helm_files
-        assert "helm/templates/_helpers.tpl" in helm_files
+        missing = {
+            "helm/Chart.yaml", "helm/values.yaml",
+            "helm/templates/deployment-frontend.yaml", "helm/templates/_helpers.tpl",
+        } - helm_files.keys()
+        assert not missing, f"missing files: {missing}"
         
         # Check Chart.yaml content
-        chart_yaml = helm_files["helm/Chart.yaml"]
-        chart_data = yaml.safe_load(chart_yaml)
-        assert chart_data["name"] == "test-app"
-        assert chart_data["type"] == "application"
-        assert chart_data["version"] == "0.1.0"
+        chart_data = parsed_yaml["helm/Chart.yaml"]
+        expected_chart = {"name": "test-app", "type": "application", "version": "0.1.0"}
+        assert {key: chart_data.get(key) for key in expected_chart} == expected_chart
         assert "dependencies" in chart_data
         
         # Check values.yaml content
-        values_yaml = helm_files["helm/values.yaml"]
-        values_data = yaml.safe_load(values_yaml)
-        assert "replicaCount" in values_data
-        assert "image" in values_data
-        assert "service" in values_data
-        assert "ingress" in values_data
-        assert "autoscaling" in values_data
+        missing = {"replicaCount", "image", "service", "ingress", "autoscaling"} - parsed_yaml["helm/values.yaml"].keys()
+        assert not missing, f"missing values: {missing}"
         
         # Check template content
         deployment = helm_files["helm/templates/deployment-frontend.yaml"]
         assert "{{ include \"test-app.fullname\" . }}-frontend" in deployment
         assert "{{ .Values.replicaCount.frontend }}" in deployment
     
-    def test_get_github_actions_files(self, devops_agent):
+    def test_get_github_actions_files(self, github_actions_files):
         """Test GitHub Actions workflow files generation"""
-        task = {"title": "Test App"}
-        ga_files = devops_agent._get_github_actions_files(task)
         
         # Check required workflow files
-        assert ".github/workflows/ci-cd.yml" in ga_files
-        assert ".github/workflows/security-scan.yml" in ga_files
-        assert ".github/workflows/performance-test.yml" in ga_files
+        assert ".github/workflows/ci-cd.yml" in github_actions_files
+        assert ".github/workflows/security-scan.yml" in github_actions_files
+        assert ".github/workflows/performance-test.yml" in github_actions_files
         
         # Check CI/CD workflow content
-        ci_cd = ga_files[".github/workflows/ci-cd.yml"]
-        assert "name: CI/CD Pipeline" in ci_cd
-        assert "on:" in ci_cd
-        assert "jobs:" in ci_cd
-        assert "test:" in ci_cd
-        assert "build-and-push:" in ci_cd
-        assert "deploy:" in ci_cd
-        
-        # Check services configuration
-        assert "postgres:" in ci_cd
-        assert "redis:" in ci_cd
+        ci_cd = github_actions_files[".github/workflows/ci-cd.yml"]
+        assert_all_substrings(ci_cd, [
+            "name: CI/CD Pipeline", "on:", "jobs:", "test:", "build-and-push:", "deploy:",
+            # Services, security scan and Docker build
+            "postgres:", "redis:", "trivy-action", "docker/build-push-action", "REGISTRY",
+        ])
         
         # Check security scanning
-        assert "trivy-action" in ci_cd
-        assert "security-scan:" in ga_files[".github/workflows/security-scan.yml"]
-        
-        # Check Docker build steps
-        assert "docker/build-push-action" in ci_cd
-        assert "REGISTRY" in ci_cd
+        assert "security-scan:" in github_actions_files[".github/workflows/security-scan.yml"]
     
     def test_get_gitlab_ci_files(self, devops_agent):
         """Test GitLab CI pipeline files generation"""
@@ -331,10 +349,8 @@ class TestDevOpsAgent:
         assert "'Backend Tests'" in jenkinsfile
         assert "'Frontend Tests'" in jenkinsfile
     
-    def test_get_terraform_files(self, devops_agent):
+    def test_get_terraform_files(self, terraform_files):
         """Test Terraform Infrastructure as Code files generation"""
-        task = {"title": "Test App"}
-        terraform_files = devops_agent._get_terraform_files(task)
         
         # Check required Terraform files
         assert "terraform/main.tf" in terraform_files
@@ -344,49 +360,40 @@ class TestDevOpsAgent:
         assert "terraform/outputs.tf" in terraform_files
         
         # Check main.tf content
-        main_tf = terraform_files["terraform/main.tf"]
-        assert "terraform {" in main_tf
-        assert "required_version = \">= 1.0\"" in main_tf
-        assert "hashicorp/aws" in main_tf
-        assert "hashicorp/kubernetes" in main_tf
-        assert "backend \"s3\"" in main_tf
+        assert_all_substrings(terraform_files["terraform/main.tf"], [
+            "terraform {", 'required_version = ">= 1.0"', "hashicorp/aws",
+            "hashicorp/kubernetes", 'backend "s3"',
+        ])
         
         # Check variables.tf content
-        variables_tf = terraform_files["terraform/variables.tf"]
-        assert "variable \"aws_region\"" in variables_tf
-        assert "variable \"cluster_name\"" in variables_tf
-        assert "variable \"node_groups\"" in variables_tf
+        assert_all_substrings(terraform_files["terraform/variables.tf"], [
+            'variable "aws_region"', 'variable "cluster_name"', 'variable "node_groups"',
+        ])
         
         # Check EKS configuration
-        eks_tf = terraform_files["terraform/eks.tf"]
-        assert "module \"vpc\"" in eks_tf
-        assert "module \"eks\"" in eks_tf
-        assert "terraform-aws-modules/vpc/aws" in eks_tf
-        assert "terraform-aws-modules/eks/aws" in eks_tf
+        assert_all_substrings(terraform_files["terraform/eks.tf"], [
+            'module "vpc"', 'module "eks"',
+            "terraform-aws-modules/vpc/aws", "terraform-aws-modules/eks/aws",
+        ])
         
         # Check addons
-        addons_tf = terraform_files["terraform/addons.tf"]
-        assert "aws-load-balancer-controller" in addons_tf
-        assert "cert-manager" in addons_tf
-        assert "ingress-nginx" in addons_tf
+        assert_all_substrings(terraform_files["terraform/addons.tf"], [
+            "aws-load-balancer-controller", "cert-manager", "ingress-nginx",
+        ])
     
-    def test_get_ansible_files(self, devops_agent):
+    def test_get_ansible_files(self, ansible_files, parsed_yaml):
         """Test Ansible playbook files generation"""
-        task = {"title": "Test App"}
-        ansible_files = devops_agent._get_ansible_files(task)
         
         # Check required Ansible files
-        assert "ansible/inventory.yml" in ansible_files
-        assert "ansible/playbook.yml" in ansible_files
-        assert "ansible/templates/docker-compose.yml.j2" in ansible_files
-        assert "ansible/group_vars/all.yml" in ansible_files
+        missing = {
+            "ansible/inventory.yml", "ansible/playbook.yml",
+            "ansible/templates/docker-compose.yml.j2", "ansible/group_vars/all.yml",
+        } - ansible_files.keys()
+        assert not missing, f"missing files: {missing}"
         
         # Check inventory content
-        inventory = yaml.safe_load(ansible_files["ansible/inventory.yml"])
-        assert "all" in inventory
-        assert "children" in inventory["all"]
-        assert "web" in inventory["all"]["children"]
-        assert "db" in inventory["all"]["children"]
+        children = parsed_yaml["ansible/inventory.yml"]["all"]["children"]
+        assert {"web", "db"} <= children.keys()
         
         # Check playbook content
         playbook = ansible_files["ansible/playbook.yml"]
@@ -402,33 +409,29 @@ class TestDevOpsAgent:
         assert "{{ registry }}/{{ app_name }}" in template
         assert "{{ db_password }}" in template
     
-    def test_get_prometheus_grafana_files(self, devops_agent):
+    def test_get_prometheus_grafana_files(self, monitoring_files, parsed_yaml):
         """Test Prometheus and Grafana monitoring files generation"""
-        task = {"title": "Test App"}
-        monitoring_files = devops_agent._get_prometheus_grafana_files(task)
         
         # Check required monitoring files
-        assert "monitoring/prometheus-config.yml" in monitoring_files
-        assert "monitoring/alert_rules.yml" in monitoring_files
-        assert "monitoring/grafana/dashboards/application-dashboard.json" in monitoring_files
-        assert "monitoring/docker-compose.monitoring.yml" in monitoring_files
+        missing = {
+            "monitoring/prometheus-config.yml", "monitoring/alert_rules.yml",
+            "monitoring/grafana/dashboards/application-dashboard.json",
+            "monitoring/docker-compose.monitoring.yml",
+        } - monitoring_files.keys()
+        assert not missing, f"missing files: {missing}"
         
         # Check Prometheus configuration
-        prometheus_config = yaml.safe_load(monitoring_files["monitoring/prometheus-config.yml"])
-        assert "global" in prometheus_config
+        prometheus_config = parsed_yaml["monitoring/prometheus-config.yml"]
         assert "scrape_configs" in prometheus_config
         assert prometheus_config["global"]["scrape_interval"] == "15s"
         
         # Check alert rules
-        alert_rules = yaml.safe_load(monitoring_files["monitoring/alert_rules.yml"])
-        assert "groups" in alert_rules
-        assert len(alert_rules["groups"]) >= 2
-        assert "application_alerts" in [group["name"] for group in alert_rules["groups"]]
-        assert "kubernetes_alerts" in [group["name"] for group in alert_rules["groups"]]
+        group_names = {group["name"] for group in parsed_yaml["monitoring/alert_rules.yml"]["groups"]}
+        assert {"application_alerts", "kubernetes_alerts"} <= group_names
         
         # Check Grafana dashboard
         dashboard_json = monitoring_files["monitoring/grafana/dashboards/application-dashboard.json"]
-        dashboard = json.loads(dashboard_json)
+        dashboard = _json_loads(dashboard_json)
         assert "dashboard" in dashboard
         assert dashboard["dashboard"]["title"] == "Application Monitoring Dashboard"
         assert len(dashboard["dashboard"]["panels"]) > 5
@@ -440,10 +443,8 @@ class TestDevOpsAgent:
         assert "node-exporter:" in monitoring_compose
         assert "alertmanager:" in monitoring_compose
     
-    def test_get_elk_stack_files(self, devops_agent):
+    def test_get_elk_stack_files(self, elk_files, parsed_yaml):
         """Test ELK Stack logging files generation"""
-        task = {"title": "Test App"}
-        elk_files = devops_agent._get_elk_stack_files(task)
         
         # Check required ELK files
         assert "logging/docker-compose.elk.yml" in elk_files
@@ -459,7 +460,7 @@ class TestDevOpsAgent:
         assert "filebeat:" in elk_compose
         
         # Check Logstash configuration
-        logstash_config = yaml.safe_load(elk_files["logging/logstash/config/logstash.yml"])
+        logstash_config = parsed_yaml["logging/logstash/config/logstash.yml"]
         assert logstash_config["http.host"] == "0.0.0.0"
         
         # Check Logstash pipeline
@@ -471,14 +472,12 @@ class TestDevOpsAgent:
         assert "elasticsearch {" in logstash_conf
         
         # Check Filebeat configuration
-        filebeat_config = yaml.safe_load(elk_files["logging/filebeat/filebeat.yml"])
+        filebeat_config = parsed_yaml["logging/filebeat/filebeat.yml"]
         assert "filebeat.inputs" in filebeat_config
         assert filebeat_config["filebeat.inputs"][0]["type"] == "container"
     
-    def test_get_additional_devops_files(self, devops_agent):
+    def test_get_additional_devops_files(self, additional_files):
         """Test additional DevOps utility files generation"""
-        task = {"title": "Test App"}
-        additional_files = devops_agent._get_additional_devops_files(task)
         
         # Check required utility files
         assert "scripts/deploy.sh" in additional_files
@@ -524,87 +523,77 @@ class TestDevOpsAgent:
     @pytest.mark.asyncio
     async def test_create_devops_setup(self, devops_agent):
         """Test comprehensive DevOps setup creation"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            task = {
-                "title": "Test Application",
-                "description": "Create complete DevOps setup",
-                "requirements": {
-                    "kubernetes": True,
-                    "terraform": True,
-                    "monitoring": "prometheus"
-                },
-                "output_dir": temp_dir
-            }
-            
+        task = {
+            "title": "Test Application",
+            "description": "Create complete DevOps setup",
+            "requirements": {
+                "kubernetes": True,
+                "terraform": True,
+                "monitoring": "prometheus"
+            },
+            "output_dir": "/nonexistent/devops"
+        }
+        
+        # Only the metadata is checked, so no file reaches the disk
+        written = mock_open()
+        with patch("agents.devops.open", written, create=True), \
+                patch("agents.devops.os.makedirs"):
             result = await devops_agent._create_devops_setup(
-                task, temp_dir, "docker", "kubernetes", "github-actions", 
+                task, "/nonexistent/devops", "docker", "kubernetes", "github-actions", 
                 "terraform", "prometheus-grafana"
             )
-            
-            assert result["status"] == "completed"
-            assert result["container_platform"] == "docker"
-            assert result["orchestrator"] == "kubernetes"
-            assert result["ci_cd_platform"] == "github-actions"
-            assert result["iac_tool"] == "terraform"
-            assert result["monitoring_stack"] == "prometheus-grafana"
-            assert len(result["files_created"]) > 50  # Should create many files
-            
-            # Check that some key features are included
-            expected_features = [
-                "Multi-stage Docker builds",
-                "Kubernetes manifests", 
-                "Helm charts",
-                "CI/CD pipelines",
-                "Infrastructure as Code",
-                "Monitoring setup"
-            ]
-            for feature in expected_features:
-                assert feature in result["features"]
+        
+        assert written.call_count == len(result["files_created"])
+        assert result["status"] == "completed"
+        assert result["container_platform"] == "docker"
+        assert result["orchestrator"] == "kubernetes"
+        assert result["ci_cd_platform"] == "github-actions"
+        assert result["iac_tool"] == "terraform"
+        assert result["monitoring_stack"] == "prometheus-grafana"
+        assert len(result["files_created"]) > 50  # Should create many files
+        
+        # Check that some key features are included
+        missing = _EXPECTED_SETUP_FEATURES - set(result["features"])
+        assert not missing, f"missing features: {missing}"
     
     @pytest.mark.asyncio
-    async def test_process_task(self, devops_agent):
+    async def test_process_task(self, fresh_agent, tmp_path):
         """Test task processing"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            task = {
-                "title": "DevOps Setup",
-                "description": "Complete DevOps infrastructure",
-                "architecture": {"deployment": "kubernetes"},
-                "requirements": {"ci_cd": "github actions", "monitoring": "prometheus"},
-                "output_dir": temp_dir
-            }
-            
-            result = await devops_agent.process_task(task)
-            
-            assert result["status"] == "completed"
-            assert result["container_platform"] == "docker"
-            assert result["orchestrator"] == "kubernetes" 
-            assert result["ci_cd_platform"] == "github-actions"
-            assert devops_agent.status == "idle"
+        task = {
+            "title": "DevOps Setup",
+            "description": "Complete DevOps infrastructure",
+            "architecture": {"deployment": "kubernetes"},
+            "requirements": {"ci_cd": "github actions", "monitoring": "prometheus"},
+            "output_dir": str(tmp_path)
+        }
+        
+        result = await fresh_agent.process_task(task)
+        
+        assert result["status"] == "completed"
+        assert result["container_platform"] == "docker"
+        assert result["orchestrator"] == "kubernetes" 
+        assert result["ci_cd_platform"] == "github-actions"
+        assert fresh_agent.status == "idle"
     
     @pytest.mark.asyncio
-    async def test_process_task_error_handling(self, devops_agent):
+    async def test_process_task_error_handling(self, fresh_agent):
         """Test error handling in task processing"""
         task = {
             "title": "Broken DevOps task",
             "output_dir": "/invalid/path/that/does/not/exist"
         }
         
-        result = await devops_agent.process_task(task)
+        result = await fresh_agent.process_task(task)
         
         assert result["status"] == "error"
         assert "message" in result
         assert result["files_created"] == []
-        assert devops_agent.status == "error"
+        assert fresh_agent.status == "error"
     
-    def test_docker_compose_structure(self, devops_agent):
+    def test_docker_compose_structure(self, parsed_yaml):
         """Test Docker Compose file structure"""
-        task = {"title": "test-app"}
-        docker_files = devops_agent._get_docker_files(task)
         
-        compose_content = docker_files["docker/docker-compose.yml"]
-        
-        # Parse YAML to ensure it's valid
-        compose_data = yaml.safe_load(compose_content)
+        compose_data = parsed_yaml["docker/docker-compose.yml"]
         assert compose_data["version"] == "3.8"
         assert "services" in compose_data
         assert "frontend" in compose_data["services"]
@@ -614,62 +603,45 @@ class TestDevOpsAgent:
         assert "volumes" in compose_data
         assert "networks" in compose_data
     
-    def test_kubernetes_yaml_validity(self, devops_agent):
+    def test_kubernetes_yaml_validity(self, k8s_files):
         """Test that generated Kubernetes manifests are valid YAML"""
-        task = {"title": "test-app"}
-        k8s_files = devops_agent._get_kubernetes_files(task)
         
         # Test that all YAML files are valid
         for filename, content in k8s_files.items():
             try:
-                # Split multi-document YAML files
-                for doc in content.split("---"):
-                    if doc.strip():
-                        yaml.safe_load(doc)
-            except yaml.YAMLError as e:
+                # Parse the multi-document YAML in one pass
+                list(_load_all(content))
+            except _YAML_ERRORS as e:
                 pytest.fail(f"Invalid YAML in {filename}: {e}")
     
-    def test_terraform_syntax_validity(self, devops_agent):
+    def test_terraform_syntax_validity(self, terraform_files):
         """Test that generated Terraform files have basic syntax validity"""
-        task = {"title": "test-app"}
-        terraform_files = devops_agent._get_terraform_files(task)
         
         # Check that Terraform files contain expected blocks
-        main_tf = terraform_files["terraform/main.tf"]
-        assert "terraform {" in main_tf
-        assert "provider \"aws\" {" in main_tf
-        assert "provider \"kubernetes\" {" in main_tf
-        
-        variables_tf = terraform_files["terraform/variables.tf"]
-        assert 'variable "aws_region"' in variables_tf
-        assert 'variable "cluster_name"' in variables_tf
-        
-        outputs_tf = terraform_files["terraform/outputs.tf"]
-        assert 'output "cluster_endpoint"' in outputs_tf
-        assert 'output "cluster_name"' in outputs_tf
+        assert_all_substrings(terraform_files["terraform/main.tf"], [
+            "terraform {", 'provider "aws" {', 'provider "kubernetes" {',
+        ])
+        assert_all_substrings(terraform_files["terraform/variables.tf"], [
+            'variable "aws_region"', 'variable "cluster_name"',
+        ])
+        assert_all_substrings(terraform_files["terraform/outputs.tf"], [
+            'output "cluster_endpoint"', 'output "cluster_name"',
+        ])
     
-    def test_comprehensive_feature_coverage(self, devops_agent):
+    def test_comprehensive_feature_coverage(self, docker_files, k8s_files, github_actions_files):
         """Test that all advertised features are actually implemented"""
-        task = {"title": "comprehensive-app"}
         
         # Test Docker features
-        docker_files = devops_agent._get_docker_files(task)
-        backend_dockerfile = docker_files["docker/Dockerfile.backend"]
-        
-        # Multi-stage builds
-        assert "as builder" in backend_dockerfile
-        assert "COPY --from=builder" in backend_dockerfile
-        
-        # Security features
-        assert "useradd" in backend_dockerfile
-        assert "USER " in backend_dockerfile
-        
-        # Health checks
-        assert "HEALTHCHECK" in backend_dockerfile
+        assert_all_substrings(docker_files["docker/Dockerfile.backend"], [
+            # Multi-stage builds
+            "as builder", "COPY --from=builder",
+            # Security features
+            "useradd", "USER ",
+            # Health checks
+            "HEALTHCHECK",
+        ])
         
         # Test Kubernetes features
-        k8s_files = devops_agent._get_kubernetes_files(task)
-        
         # Auto-scaling
         assert "k8s/hpa.yaml" in k8s_files
         hpa = k8s_files["k8s/hpa.yaml"]
@@ -682,20 +654,17 @@ class TestDevOpsAgent:
         assert "k8s/ingress.yaml" in k8s_files
         
         # Test CI/CD features
-        github_files = devops_agent._get_github_actions_files(task)
-        ci_cd = github_files[".github/workflows/ci-cd.yml"]
+        ci_cd = github_actions_files[".github/workflows/ci-cd.yml"]
         
         # Security scanning
         assert "trivy" in ci_cd
-        assert "security-scan:" in github_files[".github/workflows/security-scan.yml"]
+        assert "security-scan:" in github_actions_files[".github/workflows/security-scan.yml"]
         
         # Performance testing
-        assert ".github/workflows/performance-test.yml" in github_files
+        assert ".github/workflows/performance-test.yml" in github_actions_files
     
-    def test_script_executability_markers(self, devops_agent):
+    def test_script_executability_markers(self, additional_files):
         """Test that shell scripts have proper shebang and structure"""
-        task = {"title": "test-app"}
-        additional_files = devops_agent._get_additional_devops_files(task)
         
         scripts = [
             "scripts/deploy.sh",
@@ -706,15 +675,11 @@ class TestDevOpsAgent:
         for script_path in scripts:
             script_content = additional_files[script_path]
             
-            # Check shebang
-            assert script_content.startswith("#!/bin/bash")
-            
-            # Check error handling
-            assert "set -e" in script_content
+            # Check shebang and error handling
+            assert _SCRIPT_HEADER.search(script_content), script_path
             
             # Check functions are defined properly
             if "deploy.sh" in script_path:
-                assert "log()" in script_content
-                assert "error()" in script_content
-                assert "warn()" in script_content
+                functions = set(_SCRIPT_FUNCTIONS.findall(script_content))
+                assert {"log", "error", "warn"} <= functions
 
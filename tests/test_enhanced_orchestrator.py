@@ -4,12 +4,31 @@ Tests for Enhanced Orchestrator Agent
 """
 import pytest
 import asyncio
+import copy
 import json
-from unittest.mock import Mock, AsyncMock, patch
+from types import MappingProxyType
+from unittest.mock import Mock
 from agents.orchestrator_enhanced import EnhancedOrchestratorAgent, TaskPriority, ResourceType
+from tests.helpers import FakeOllama
+
+# Canned Ollama planning response, serialized once at import
+_MOCK_PLAN_RESPONSE = MappingProxyType({
+    'response': json.dumps({
+        "project_name": "Enhanced Todo App",
+        "description": "Advanced todo application",
+        "complexity_score": 6,
+        "phases": [
+            {
+                "id": "analysis",
+                "name": "Analysis",
+                "tasks": [{"id": "req_analysis", "title": "Requirements Analysis"}]
+            }
+        ]
+    })
+})
 
 class TestEnhancedOrchestrator:
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def config(self):
         return {
             'agents': {
@@ -22,28 +41,42 @@ class TestEnhancedOrchestrator:
             }
         }
     
-    @pytest.fixture
-    def orchestrator(self, config):
+    @pytest.fixture(scope="session")
+    def shared_orchestrator(self, config):
+        """Only for tests that do not change orchestrator state"""
         return EnhancedOrchestratorAgent(config)
     
-    def test_initialization(self, orchestrator):
+    @pytest.fixture
+    def orchestrator(self, shared_orchestrator):
+        # Resources, protocols and projects are mutated in place; the deep
+        # copy shares only the logger (no extra StreamHandler per test)
+        return copy.deepcopy(shared_orchestrator)
+    
+    @pytest.fixture
+    def mock_ollama(self, monkeypatch):
+        """Replace the shared Ollama client; tests set .response"""
+        client = FakeOllama()
+        monkeypatch.setattr("agents.orchestrator_enhanced.ollama_client", client)
+        return client
+    
+    def test_initialization(self, shared_orchestrator):
         """Test orchestrator initialization"""
-        assert orchestrator.agent_id == "enhanced_orchestrator"
-        assert orchestrator.name == "Enhanced Project Orchestrator"
-        assert len(orchestrator.project_templates) > 0
-        assert ResourceType.CPU in orchestrator.available_resources
-        assert len(orchestrator.coordination_protocols) >= 0
+        assert shared_orchestrator.agent_id == "enhanced_orchestrator"
+        assert shared_orchestrator.name == "Enhanced Project Orchestrator"
+        assert len(shared_orchestrator.project_templates) > 0
+        assert ResourceType.CPU in shared_orchestrator.available_resources
+        assert len(shared_orchestrator.coordination_protocols) >= 0
     
-    def test_capabilities(self, orchestrator):
+    def test_capabilities(self, shared_orchestrator):
         """Test orchestrator capabilities"""
-        capabilities = orchestrator.get_capabilities()
+        capabilities = shared_orchestrator.get_capabilities()
         assert "advanced_project_planning" in capabilities
         assert "intelligent_task_coordination" in capabilities
         assert "resource_allocation_optimization" in capabilities
         assert "multi_agent_protocol_coordination" in capabilities
     
     @pytest.mark.asyncio
-    async def test_advanced_project_planning(self, orchestrator):
+    async def test_advanced_project_planning(self, orchestrator, mock_ollama):
         """Test advanced project planning"""
         project_request = {
             "type": "web_application",
@@ -52,28 +85,13 @@ class TestEnhancedOrchestrator:
             "requirements": {"users": 1000}
         }
         
-        with patch('agents.orchestrator_enhanced.ollama_client') as mock_client:
-            mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-            mock_client.generate = AsyncMock(return_value={
-                'response': json.dumps({
-                    "project_name": "Enhanced Todo App",
-                    "description": "Advanced todo application",
-                    "complexity_score": 6,
-                    "phases": [
-                        {
-                            "id": "analysis",
-                            "name": "Analysis",
-                            "tasks": [{"id": "req_analysis", "title": "Requirements Analysis"}]
-                        }
-                    ]
-                })
-            })
-            
-            result = await orchestrator.advanced_project_planning(project_request)
-            
-            assert result["project_name"] == "Enhanced Todo App"
-            assert "phases" in result
-            assert result["complexity_score"] == 6
+        mock_ollama.response = _MOCK_PLAN_RESPONSE
+        
+        result = await orchestrator.advanced_project_planning(project_request)
+        
+        assert result["project_name"] == "Enhanced Todo App"
+        assert "phases" in result
+        assert result["complexity_score"] == 6
     
     @pytest.mark.asyncio
     async def test_resource_allocation(self, orchestrator):
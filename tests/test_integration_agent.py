@@ -8,11 +8,6 @@ import json
 import tempfile
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
-import sys
-import os
-
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from agents.integration_agent import IntegrationAgent, WorkflowStatus, EventType, WorkflowStep, WorkflowDefinition
 from core.base_agent import BaseAgent
@@ -10,9 +10,6 @@ import os
 import json
 from unittest.mock import Mock, patch, AsyncMock
 
-import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from agents.frontend_enhanced import FrontendEnhancedAgent
 from agents.backend_enhanced import BackendEnhancedAgent
 from agents.devops import DevOpsAgent
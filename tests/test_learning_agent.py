@@ -8,13 +8,9 @@ import json
 import tempfile
 import sqlite3
 import os
-import sys
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from agents.learning_agent import LearningAgent, CodePattern, ProjectOutcome, Recommendation
 
 @pytest.fixture
@@ -0,0 +1,222 @@
+
+"""
+Test cases for the Ollama client
+"""
+import pytest
+import pytest_asyncio
+import asyncio
+import json
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import core.ollama_client as ollama_module
+from core.ollama_client import OllamaClient, _load_yaml_config
+from core.response_cache import ResponseCache
+
+@pytest.fixture
+def client():
+    return OllamaClient()
+
+class TestSharedSession:
+    """Test the module-wide aiohttp session"""
+
+    def test_session_dropped_when_loop_closes(self, client):
+        first = asyncio.run(client._get_session())
+        second = asyncio.run(client._get_session())
+
+        assert second is not first
+        assert first.closed
+        assert not second.closed
+        assert first not in ollama_module._sessions.values()
+        asyncio.run(client.aclose())
+
+    @pytest.mark.asyncio
+    async def test_session_not_shared_across_transports(self, client):
+        unix_client = OllamaClient("unix:///tmp/ollama-test.sock")
+        slow_client = OllamaClient()
+        slow_client._timeout = client._timeout + 60
+
+        session = await client._get_session()
+        unix_session = await unix_client._get_session()
+        slow_session = await slow_client._get_session()
+
+        assert isinstance(unix_session.connector, aiohttp.UnixConnector)
+        assert not isinstance(session.connector, aiohttp.UnixConnector)
+        assert slow_session is not session
+        assert slow_session.timeout.total == client._timeout + 60
+        assert await OllamaClient()._get_session() is session
+        await client.aclose()
+        assert unix_client.session is None
+
+    @pytest.mark.asyncio
+    async def test_session_reused_within_loop(self, client):
+        first = await client._get_session()
+        second = await client._get_session()
+
+        assert first is second
+        await client.aclose()
+        assert client.session is None
+
+class TestPayloadEncoding:
+    """Test the prefix-reusing generate payload encoder"""
+
+    @pytest.mark.parametrize("system,keep_alive", [
+        (None, None),
+        ("You are a helpful assistant", None),
+        (None, "5m"),
+        ("System \"quoted\" ü", "10m"),
+    ])
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_payload_matches_dict(self, client, system, keep_alive, stream):
+        expected = {"model": "codellama:7b", "stream": stream, "prompt": "Schreibe \"Code\"\n"}
+        if system:
+            expected["system"] = system
+        if keep_alive:
+            expected["keep_alive"] = keep_alive
+
+        for _ in range(2):  # second call reuses the cached prefix
+            payload = client._encode_payload("codellama:7b", expected["prompt"], system, stream, keep_alive)
+            assert json.loads(payload) == expected
+
+    def test_payload_with_stdlib_json(self, client, monkeypatch):
+        monkeypatch.setattr(ollama_module, "_json_dumps", lambda obj: json.dumps(obj).encode("utf-8"))
+
+        payload = client._encode_payload("llama3", "hi", "sys", False, "5m")
+        assert json.loads(payload) == {
+            "model": "llama3", "stream": False, "prompt": "hi", "system": "sys", "keep_alive": "5m"
+        }
+
+class TestStreaming:
+    """Test NDJSON streaming against a local fake Ollama server"""
+
+    @pytest_asyncio.fixture
+    async def server(self):
+        async def generate(request):
+            body = await request.json()
+            response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+            await response.prepare(request)
+            for token in ["Hallo", " ", "Welt"]:
+                await response.write(json.dumps({"response": token, "done": False}).encode() + b"\n")
+            await response.write(b"\n")  # blank lines are skipped
+            await response.write(json.dumps({
+                "response": "", "done": True, "model": body["model"], "stream": body["stream"]
+            }).encode() + b"\n")
+            await response.write_eof()
+            return response
+
+        app = web.Application()
+        app.router.add_post("/api/generate", generate)
+        server = TestServer(app)
+        await server.start_server()
+        yield server
+        await server.close()
+
+    @pytest.mark.asyncio
+    async def test_generate_stream_yields_tokens(self, client, server):
+        client.base_url = str(server.make_url("")).rstrip("/")
+
+        tokens = [token async for token in client.generate_stream("m", "p")]
+        assert tokens == ["Hallo", " ", "Welt"]
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_generate_assembles_stream(self, client, server):
+        client.base_url = str(server.make_url("")).rstrip("/")
+
+        result = await client.generate("m", "p", stream=True)
+        assert result["response"] == "Hallo Welt"
+        assert result["done"] is True
+        assert result["stream"] is True
+        await client.aclose()
+
+class TestConnector:
+    """Test the connector choice for TCP vs. Unix socket"""
+
+    def test_unix_base_url_sets_socket_path(self):
+        client = OllamaClient("unix:///run/ollama.sock")
+
+        assert client.socket_path == "/run/ollama.sock"
+        assert client.base_url == "http://localhost"
+
+    @pytest.mark.asyncio
+    async def test_unix_connector_when_socket_configured(self, client, tmp_path):
+        client.socket_path = str(tmp_path / "ollama.sock")
+
+        connector = client._make_connector()
+        assert isinstance(connector, aiohttp.UnixConnector)
+        assert connector.path == client.socket_path
+        await connector.close()
+
+    @pytest.mark.asyncio
+    async def test_tcp_connector_by_default(self, client):
+        client.socket_path = None
+
+        connector = client._make_connector()
+        assert isinstance(connector, aiohttp.TCPConnector)
+        await connector.close()
+
+class TestHealthCheck:
+    """Test health reporting when Ollama is unreachable"""
+
+    @pytest.mark.asyncio
+    async def test_check_health_false_when_unreachable(self, client):
+        client.base_url = "http://127.0.0.1:9"
+
+        assert await client.check_health() is False
+        assert await client.health_status() == (False, [])
+        await client.aclose()
+
+class TestResponseCaching:
+    """Test generate() against the persistent cache"""
+
+    @pytest.mark.asyncio
+    async def test_generate_served_from_cache(self, client, tmp_path):
+        client.cache_enabled = True
+        client._cache = ResponseCache(cache_dir=str(tmp_path))
+        client._cache.set(ResponseCache.make_key("generate", "model", None, "prompt"),
+                          {"response": "cached"})
+
+        # No Ollama server needed, the hit never reaches the network
+        assert await client.generate("model", "prompt") == {"response": "cached"}
+        client._cache.close()
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_cache_opened_once_off_loop(self, client, tmp_path, monkeypatch):
+        client.cache_enabled = True
+        client.config = {"ollama": {"cache_dir": str(tmp_path / "cache")}}
+        opened = []
+        to_thread = asyncio.to_thread
+
+        async def recording_to_thread(func, *args, **kwargs):
+            opened.append(func)
+            return await to_thread(func, *args, **kwargs)
+
+        monkeypatch.setattr(ollama_module.asyncio, "to_thread", recording_to_thread)
+        first = await client._get_cache()
+        assert await client._get_cache() is first
+        assert opened == [ResponseCache]
+        first.close()
+
+class TestConfigLoading:
+    """Test YAML config caching"""
+
+    def test_missing_file_is_not_cached(self, tmp_path):
+        path = tmp_path / "nexus_config.yaml"
+        assert _load_yaml_config(str(path)) == {}
+
+        path.write_text("ollama:\n  timeout: 5\n")
+        assert _load_yaml_config(str(path)) == {"ollama": {"timeout": 5}}
+
+    def test_callers_get_independent_copies(self, tmp_path):
+        path = tmp_path / "nexus_config.yaml"
+        path.write_text("ollama:\n  timeout: 5\n")
+
+        first = _load_yaml_config(str(path))
+        first["ollama"]["timeout"] = 99
+        assert _load_yaml_config(str(path))["ollama"]["timeout"] == 5
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,61 @@
+
+"""
+Test cases for the persistent LLM response cache
+"""
+import pytest
+
+from core.response_cache import ResponseCache
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path)
+
+@pytest.fixture
+def cache(cache_dir):
+    response_cache = ResponseCache(cache_dir=cache_dir)
+    yield response_cache
+    response_cache.close()
+
+class TestResponseCache:
+    """Test response cache behaviour"""
+
+    def test_key_is_stable(self):
+        key1 = ResponseCache.make_key("generate", "codellama:7b", "system", "prompt")
+        key2 = ResponseCache.make_key("generate", "codellama:7b", "system", "prompt")
+        key3 = ResponseCache.make_key("generate", "codellama:7b", None, "prompt")
+
+        assert key1 == key2
+        assert key1 != key3
+
+    def test_set_and_get(self, cache):
+        key = ResponseCache.make_key("generate", "model", None, "hello")
+        assert cache.get(key) is None
+
+        cache.set(key, {"response": "world", "done": True})
+        assert cache.get(key) == {"response": "world", "done": True}
+
+    def test_expired_entry_is_miss(self, cache):
+        key = ResponseCache.make_key("generate", "model", None, "old")
+        cache.set(key, {"response": "stale"}, expire=-1)
+
+        assert cache.get(key) is None
+
+    def test_persists_across_instances(self, cache_dir):
+        key = ResponseCache.make_key("chat", "model", [{"role": "user", "content": "hi"}])
+        first = ResponseCache(cache_dir=cache_dir)
+        first.set(key, {"message": {"content": "hello"}})
+        first.close()
+
+        second = ResponseCache(cache_dir=cache_dir)
+        assert second.get(key) == {"message": {"content": "hello"}}
+        second.close()
+
+    def test_clear(self, cache):
+        key = ResponseCache.make_key("generate", "model", None, "x")
+        cache.set(key, {"response": "y"})
+        cache.clear()
+
+        assert cache.get(key) is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
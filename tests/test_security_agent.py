@@ -7,13 +7,9 @@ import asyncio
 import json
 import tempfile
 import os
-import sys
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from agents.security_agent import SecurityAgent, SecurityVulnerability, SecurityScanResult, ComplianceCheck
 
 @pytest.fixture
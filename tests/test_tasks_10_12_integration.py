@@ -7,12 +7,8 @@ import asyncio
 import json
 import tempfile
 import os
-import sys
 from unittest.mock import AsyncMock, MagicMock, patch
 
-# Add parent directory to path for imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from agents.integration_agent import IntegrationAgent
 from agents.learning_agent import LearningAgent  
 from agents.security_agent import SecurityAgent